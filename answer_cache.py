@@ -0,0 +1,182 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+# disk hits buffered before their access times are written (writes flush them too)
+ACCESS_FLUSH_EVERY = 64
+
+
+def make_cache_key(question_norm: str, model: str, prompt_version: str, corpus_version: str,
+                   corpus: str | None = None) -> str:
+    """`corpus` (tenant/product) only when set, so untagged keys stay as they were."""
+    parts = [question_norm, model, prompt_version, corpus_version]
+    if corpus:
+        parts.append(corpus)
+    raw = "\x1f".join(parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """
+    Two-level answer cache for the RAG path.
+
+    - memory: bounded LRU, per process
+    - disk (optional): SQLite file shared by every uvicorn worker, survives restarts
+
+    Both levels expire entries after `ttl_seconds`. Entries from other corpus
+    versions are dropped by `invalidate_except()` when the corpus changes.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 86400,
+                 db_path: str | None = None, max_db_entries: int = 100_000):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_db_entries = max_db_entries
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()  # memory level; never held across SQLite calls
+        self._db_lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self._touched: Dict[str, float] = {}  # disk hits whose access time is not written yet
+        self._writes = 0
+        self.stats_counts = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS answers (
+                    key TEXT PRIMARY KEY,
+                    answer TEXT NOT NULL,
+                    corpus_version TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+                """
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS answers_accessed ON answers (accessed)")
+            self._db.commit()
+
+    # ---------- READ ----------
+    @property
+    def has_disk(self) -> bool:
+        return self._db is not None
+
+    def get_memory(self, key: str) -> str | None:
+        """Memory level only: no I/O, safe to call on the event loop. Misses are not counted."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            answer, created = entry
+            if now - created > self.ttl_seconds:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.stats_counts["hits"] += 1
+            self.stats_counts["memory_hits"] += 1
+            return answer
+
+    def get(self, key: str) -> str | None:
+        """Memory, then disk. Blocks on SQLite when there is a disk level."""
+        answer = self.get_memory(key)
+        if answer is not None:
+            return answer
+
+        if self._db is not None:
+            now = time.time()
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT answer, created FROM answers WHERE key = ?", (key,)
+                ).fetchone()
+                fresh = row is not None and now - row[1] <= self.ttl_seconds
+                if fresh:
+                    # access times only feed eviction order; write them in batches
+                    self._touched[key] = now
+                    if len(self._touched) >= ACCESS_FLUSH_EVERY:
+                        self._flush_touched()
+                        self._db.commit()
+            if fresh:
+                with self._lock:
+                    self._remember(key, row[0], row[1])
+                    self.stats_counts["hits"] += 1
+                    self.stats_counts["disk_hits"] += 1
+                return row[0]
+
+        with self._lock:
+            self.stats_counts["misses"] += 1
+        return None
+
+    # ---------- WRITE ----------
+    def set(self, key: str, answer: str, corpus_version: str):
+        """Blocks on SQLite when there is a disk level."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, answer, now)
+
+        if self._db is not None:
+            with self._db_lock:
+                self._touched.pop(key, None)
+                self._flush_touched()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?)",
+                    (key, answer, corpus_version, now, now),
+                )
+                self._writes += 1
+                if self._writes % 100 == 0:
+                    self._evict_disk(now)
+                self._db.commit()
+
+    def _flush_touched(self):
+        """Write pending access times (caller holds _db_lock and commits)."""
+        if self._touched:
+            self._db.executemany(
+                "UPDATE answers SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _remember(self, key: str, answer: str, created: float):
+        self._memory[key] = (answer, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats_counts["evictions"] += 1
+
+    def _evict_disk(self, now: float):
+        self._db.execute("DELETE FROM answers WHERE created < ?", (now - self.ttl_seconds,))
+        self._db.execute(
+            """
+            DELETE FROM answers WHERE key IN (
+                SELECT key FROM answers ORDER BY accessed DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_db_entries,),
+        )
+
+    # ---------- INVALIDATION ----------
+    def invalidate_except(self, corpus_version: str):
+        """Drop everything cached for any other corpus version."""
+        with self._lock:
+            # memory keys already embed the corpus version; just start over
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._touched.clear()
+                self._db.execute("DELETE FROM answers WHERE corpus_version != ?", (corpus_version,))
+                self._db.commit()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.stats_counts["hits"] + self.stats_counts["misses"]
+        out = dict(self.stats_counts)
+        out["hit_rate"] = round(self.stats_counts["hits"] / lookups, 4) if lookups else 0.0
+        out["memory_entries"] = len(self._memory)
+        if self._db is not None:
+            with self._db_lock:
+                out["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        return out
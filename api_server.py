@@ -1,16 +1,48 @@
 import os
-import re
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
 import numpy as np
-from typing import List, Tuple
+from typing import AsyncIterator, Dict, List, Tuple
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-import requests
-from qdrant_client import QdrantClient
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from app import NESTED_DATA, get_faq_questions
+import aiohttp
+import app as handbook
+from answer_cache import AnswerCache, make_cache_key
+from corpus_version import CorpusVersionWatcher
+from embeddings import (
+    BatchingEncoder,
+    DocEmbeddingCache,
+    QueryEmbeddingCache,
+    cache_model_id,
+    encode_documents,
+    load_embedder,
+    make_encode_fn,
+)
+from chunking import count_tokens
+from context_builder import assemble_context
+from faq_index import (
+    build_exact_index,
+    load_faq_artifacts,
+    normalize,
+    normalize_rows,
+    top_k_similar,
+    top_k_similar_batch,
+)
+from http_cache import CachedBody, accepted_encoding, cached_response
+from lexical import BM25Index, reciprocal_rank_fusion
+from llm_client import CircuitBreaker, LLMClient, LLMUnavailable, upstream_reason
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Registry
+from retrievers import Hit, create_retriever
+from singleflight import SingleFlight
+from tenant_cache import CorpusFaq, TenantCache
 
 # =========================
 # LOAD ENV
@@ -19,35 +51,285 @@ load_dotenv()
 
 # Embeddings
 EMBED_MODEL_NAME = os.getenv("EMBED_MODEL_NAME", "all-MiniLM-L6-v2")
+# torch | onnx | onnx-int8 — the ONNX backends never import torch
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch").lower()
+EMBED_ONNX_DIR = os.getenv("EMBED_ONNX_DIR") or None
+EMBED_ONNX_THREADS = int(os.getenv("EMBED_ONNX_THREADS", 0))
+# model + backend, as ingest.py records it in FAQ artifacts and the doc embedding cache
+EMBED_MODEL_ID = cache_model_id(EMBED_MODEL_NAME, EMBED_BACKEND)
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", 4096))
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", 3))
+EMBED_BATCH_MAX = int(os.getenv("EMBED_BATCH_MAX", 64))
+EMBED_DOC_CACHE = os.getenv("EMBED_DOC_CACHE") or None
+# true: load the model at import, e.g. to share it copy-on-write across
+# `gunicorn --preload` workers; default: background load after startup
+EMBED_PRELOAD = os.getenv("EMBED_PRELOAD", "false").lower() in ("1", "true", "yes")
 
 # FAQ retrieval
 FAQ_RETRIEVAL_K = int(os.getenv("FAQ_RETRIEVAL_K", 3))
 FAQ_SIM_THRESHOLD = float(os.getenv("FAQ_SIM_THRESHOLD", 0.60))
+# prebuilt by ingest.py: FAQ data + memory-mapped question matrix ("" = always parse)
+FAQ_ARTIFACT_DIR = os.getenv("FAQ_ARTIFACT_DIR", "data/faq")
 
 # Qdrant
 QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", 6333))
-QDRANT_COLLECTION = "documents"
+QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "documents")
+# local-mode collection directory (as written by `QDRANT_PATH=... python ingest.py`) instead of a server
+QDRANT_PATH = os.getenv("QDRANT_PATH") or None
+
+# Tenants: requests with tenant/product are answered from that corpus only
+# (HANDBOOK_FILES / ingest DATA_PATHS entries "tenant/product=path"; untagged = all merged)
+# filter: one collection, points filtered by their corpus payload
+# collection: one collection per corpus, QDRANT_COLLECTION_TEMPLATE ({corpus} with "/" -> "_")
+TENANT_ROUTING = os.getenv("TENANT_ROUTING", "filter").lower()
+QDRANT_COLLECTION_TEMPLATE = os.getenv("QDRANT_COLLECTION_TEMPLATE", "{corpus}")
+# per-corpus FAQ data + question matrix (and BM25 per collection), loaded on first
+# request and LRU-evicted beyond TENANT_CACHE_SIZE corpora or TENANT_CACHE_MB
+TENANT_CACHE_SIZE = int(os.getenv("TENANT_CACHE_SIZE", 32))
+TENANT_CACHE_MB = float(os.getenv("TENANT_CACHE_MB", 512))
+
+# Retrieval backend: qdrant | numpy | faiss (numpy/faiss read LOCAL_INDEX_DIR built by ingest.py)
+RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "qdrant")
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", "data/index")
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", 4))
+# Max (approximate) tokens of retrieved context sent to the LLM per request
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 1200))
+
+# Hybrid retrieval: in-process BM25 next to the vector query, fused with weighted RRF
+HYBRID_ENABLED = os.getenv("HYBRID_ENABLED", "true").lower() in ("1", "true", "yes")
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", 20))
+HYBRID_DENSE_WEIGHT = float(os.getenv("HYBRID_DENSE_WEIGHT", 1.0))
+HYBRID_LEXICAL_WEIGHT = float(os.getenv("HYBRID_LEXICAL_WEIGHT", 1.0))
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", 60))
 
 # Groq
+# without a key the app still serves FAQ/cached answers; RAG answers fall back (see ask_groq_llm)
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 if not GROQ_API_KEY:
-    raise RuntimeError("GROQ_API_KEY is not set")
+    print("[groq] GROQ_API_KEY is not set — RAG questions get the fallback answer")
 GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com")
 GROQ_MODEL = "llama-3.3-70b-versatile"
 GROQ_MAX_TOKENS = int(os.getenv("GROQ_MAX_TOKENS", 1024))
 
+# Groq HTTP pool (one keep-alive pool shared by all requests)
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", 30))
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", 5))
+GROQ_POOL_MAX_CONNECTIONS = int(os.getenv("GROQ_POOL_MAX_CONNECTIONS", 200))
+GROQ_KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", 30))
+
+# Groq resilience (llm_client.LLMClient)
+# local quota, from our Groq plan's limits (0 = no local limit); a call that would
+# wait longer than GROQ_MAX_QUEUE_WAIT s for quota gets the fallback answer instead
+GROQ_RPM = float(os.getenv("GROQ_RPM", 0))
+GROQ_TPM = float(os.getenv("GROQ_TPM", 0))
+GROQ_MAX_QUEUE_WAIT = float(os.getenv("GROQ_MAX_QUEUE_WAIT", 5))
+# 429/5xx/timeouts: jittered exponential backoff, or Retry-After up to GROQ_MAX_RETRY_AFTER s
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", 2))
+GROQ_RETRY_BASE = float(os.getenv("GROQ_RETRY_BASE", 0.25))
+GROQ_RETRY_MAX = float(os.getenv("GROQ_RETRY_MAX", 4))
+GROQ_MAX_RETRY_AFTER = float(os.getenv("GROQ_MAX_RETRY_AFTER", 10))
+# breaker: open after N consecutive failures, probe again after GROQ_BREAKER_RESET s
+GROQ_BREAKER_FAILURES = int(os.getenv("GROQ_BREAKER_FAILURES", 5))
+GROQ_BREAKER_RESET = float(os.getenv("GROQ_BREAKER_RESET", 30))
+# hedging (non-streaming calls): a second request after GROQ_HEDGE_AFTER_MS, or, if 0,
+# after the observed GROQ_HEDGE_QUANTILE latency (e.g. 0.95); both 0 = off
+GROQ_HEDGE_AFTER_MS = float(os.getenv("GROQ_HEDGE_AFTER_MS", 0))
+GROQ_HEDGE_QUANTILE = float(os.getenv("GROQ_HEDGE_QUANTILE", 0))
+
+# Answer cache (RAG path). ANSWER_CACHE_DB enables the shared SQLite layer.
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 1024))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", 86400))
+ANSWER_CACHE_DB = os.getenv("ANSWER_CACHE_DB") or None
+ANSWER_CACHE_DB_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_DB_MAX_ENTRIES", 100_000))
+
+# /faqs, /faqs/categories and the frontend: serialized + gzip/brotli once, then
+# served with ETags. The catalogue URLs are unversioned and change on re-ingest, so
+# browsers revalidate every use (a 304 while unchanged); 0 = no-cache, > 0 = max-age
+FAQ_CACHE_MAX_AGE = int(os.getenv("FAQ_CACHE_MAX_AGE", 0))
+FAQ_PAGE_MAX = int(os.getenv("FAQ_PAGE_MAX", 500))
+# pages (offset/limit) per corpus, LRU; compressed lazily per requested encoding
+FAQ_PAGE_CACHE_SIZE = int(os.getenv("FAQ_PAGE_CACHE_SIZE", 64))
+STATIC_DIR = Path(os.getenv("STATIC_DIR", Path(__file__).resolve().parent))
+STATIC_CACHE_MAX_AGE = int(os.getenv("STATIC_CACHE_MAX_AGE", 3600))
+
+# /ask/batch: max questions per request, concurrent Groq calls per batch
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 1000))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", 8))
+
 
 # =========================
 # INIT CLIENTS
 # =========================
-embedder = SentenceTransformer(EMBED_MODEL_NAME)
-qdrant = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+def get_embedder():
+    """The embedding model, loaded on first use (see warm_up)."""
+    return load_embedder(EMBED_MODEL_NAME, EMBED_BACKEND, onnx_dir=EMBED_ONNX_DIR, threads=EMBED_ONNX_THREADS)
+
+
+def encode_queries(texts: List[str]) -> np.ndarray:
+    return make_encode_fn(get_embedder())(texts)
+
+
+if EMBED_PRELOAD:
+    get_embedder()
+query_encoder = BatchingEncoder(
+    encode_queries,
+    window_ms=EMBED_BATCH_WINDOW_MS,
+    max_batch=EMBED_BATCH_MAX,
+    cache=QueryEmbeddingCache(EMBED_CACHE_SIZE),
+)
+doc_embedding_cache = (
+    DocEmbeddingCache(EMBED_DOC_CACHE, EMBED_MODEL_ID)
+    if EMBED_DOC_CACHE else None
+)
+retriever = create_retriever(
+    RETRIEVER_BACKEND,
+    host=QDRANT_HOST,
+    port=QDRANT_PORT,
+    collection=QDRANT_COLLECTION,
+    path=QDRANT_PATH,
+    routing=TENANT_ROUTING,
+    collection_template=QDRANT_COLLECTION_TEMPLATE,
+    index_dir=LOCAL_INDEX_DIR,
+)
+groq_http: aiohttp.ClientSession | None = None
+groq_client = LLMClient(
+    requests_per_minute=GROQ_RPM,
+    tokens_per_minute=GROQ_TPM,
+    max_queue_wait=GROQ_MAX_QUEUE_WAIT,
+    max_retries=GROQ_MAX_RETRIES,
+    backoff_base=GROQ_RETRY_BASE,
+    backoff_max=GROQ_RETRY_MAX,
+    max_retry_after=GROQ_MAX_RETRY_AFTER,
+    breaker=CircuitBreaker(GROQ_BREAKER_FAILURES, GROQ_BREAKER_RESET),
+    hedge_after=GROQ_HEDGE_AFTER_MS / 1000,
+    hedge_quantile=GROQ_HEDGE_QUANTILE,
+)
+answer_cache = AnswerCache(
+    max_entries=ANSWER_CACHE_SIZE,
+    ttl_seconds=ANSWER_CACHE_TTL,
+    db_path=ANSWER_CACHE_DB,
+    max_db_entries=ANSWER_CACHE_DB_MAX_ENTRIES,
+)
+corpus_version = CorpusVersionWatcher()
+
+# =========================
+# METRICS (Prometheus text format on /metrics)
+# =========================
+metrics = Registry()
+STAGE_SECONDS = metrics.histogram(
+    "ask_stage_seconds", "Latency of each answer pipeline stage.", ["stage"]
+)
+REQUEST_SECONDS = metrics.histogram(
+    "ask_request_seconds", "End-to-end answer latency.", ["route", "source"]
+)
+ANSWERS_TOTAL = metrics.counter(
+    "ask_answers_total", "Answers served, by route and source (\"error\": a stream cut short).",
+    ["route", "source", "cached"]
+)
+GROQ_REQUESTS_TOTAL = metrics.counter(
+    "groq_requests_total", "Groq chat completion calls.", ["mode", "outcome"]
+)
+GROQ_ERRORS_TOTAL = metrics.counter(
+    "groq_errors_total", "Failed Groq calls by reason.", ["reason"]
+)
+GROQ_TOKENS_TOTAL = metrics.counter(
+    "groq_tokens_total", "Groq token usage (prompt estimated when not reported).", ["kind"]
+)
+GROQ_CLIENT_EVENTS = metrics.counter(
+    "groq_client_events_total", "Groq client retries and hedged requests.", ["event"]
+)
+GROQ_CIRCUIT_OPEN = metrics.gauge(
+    "groq_circuit_open", "1 while the Groq circuit breaker rejects calls.", []
+)
+LLM_FALLBACKS_TOTAL = metrics.counter(
+    "llm_fallbacks_total", "Fallback answers served without the LLM.", ["reason"]
+)
+ANSWER_CACHE_LOOKUPS = metrics.counter(
+    "answer_cache_lookups_total", "Answer cache lookups.", ["result"]
+)
+ANSWER_CACHE_ENTRIES = metrics.gauge(
+    "answer_cache_entries", "Answer cache size.", ["layer"]
+)
+QUERY_EMBED_REQUESTS = metrics.counter(
+    "query_embedding_requests_total", "Query embedding requests.", ["result"]
+)
+QUERY_EMBED_BATCHES = metrics.counter(
+    "query_embedding_batches_total", "Model encode calls for queries.", []
+)
+RAG_CALLS = metrics.counter(
+    "rag_calls_total", "RAG calls, executed or coalesced onto an in-flight one.", ["result"]
+)
+RETRIEVER_POINTS = metrics.gauge(
+    "retriever_points", "Chunks in the retrieval index, per collection (local index directory).",
+    ["backend", "collection"]
+)
+CACHED_RESPONSES = metrics.counter(
+    "cached_responses_total", "FAQ catalogue / frontend responses.", ["route", "outcome"]
+)
+CACHED_RESPONSE_BYTES = metrics.counter(
+    "cached_response_bytes_total", "Body bytes sent for FAQ catalogue / frontend responses.", ["route"]
+)
+
+
+def create_groq_client() -> aiohttp.ClientSession:
+    return aiohttp.ClientSession(
+        base_url=GROQ_BASE_URL,
+        headers={
+            "Authorization": f"Bearer {GROQ_API_KEY}",
+            "Content-Type": "application/json",
+        },
+        timeout=aiohttp.ClientTimeout(total=GROQ_TIMEOUT, connect=GROQ_CONNECT_TIMEOUT),
+        connector=aiohttp.TCPConnector(
+            limit=GROQ_POOL_MAX_CONNECTIONS,
+            keepalive_timeout=GROQ_KEEPALIVE_EXPIRY,
+        ),
+        raise_for_status=True,
+    )
+
+
+# what /readyz waits for; the app serves (exact FAQ tier first) before all are set
+READINESS = {"faq_index": False, "faq_embeddings": False, "embedder": False, "lexical": False}
+
+
+async def warm_up():
+    """Heavy startup work, off the import path and after the port is open."""
+    started = time.perf_counter()
+    try:
+        await run_in_threadpool(get_embedder)
+        await run_in_threadpool(encode_queries, ["warm up"])
+        READINESS["embedder"] = True
+
+        if not READINESS["faq_embeddings"]:
+            await run_in_threadpool(encode_faq_questions)
+    except Exception as exc:
+        print(f"[startup] embedding model unavailable — {exc}")
+        return
+
+    try:
+        await get_lexical_index()
+    except Exception as exc:
+        print(f"[hybrid] BM25 index unavailable, using dense retrieval only — {exc}")
+    READINESS["lexical"] = True
+    print(f"[startup] warm-up done in {time.perf_counter() - started:.2f}s")
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    global groq_http
+    groq_http = create_groq_client()
+    warm_up_task = asyncio.create_task(warm_up())
+    try:
+        yield
+    finally:
+        warm_up_task.cancel()
+        await groq_http.close()
+        await retriever.close()
 
 # =========================
 # FASTAPI APP
 # =========================
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -66,10 +348,25 @@ app.add_middleware(
 # =========================
 class AskRequest(BaseModel):
     question: str
+    tenant: str | None = None
+    product: str | None = None
 
 class AskResponse(BaseModel):
     answer: str
     source: str
+    score: float | None = None
+    cached: bool = False
+    input_tokens: int | None = None
+
+class BatchItem(BaseModel):
+    id: str | None = None
+    question: str
+
+class BatchAskRequest(BaseModel):
+    items: List[BatchItem]
+    concurrency: int | None = None
+    tenant: str | None = None
+    product: str | None = None
 # =========================
 # PROMPT (RAG)
 # =========================
@@ -129,130 +426,1007 @@ PROACTIVE CONTENT RESTRICTION:
 - Do NOT suggest topics or actions unless explicitly asked.
 - Do NOT introduce guidance questions.
 - Do NOT jump to advanced topics unless requested.
+""".strip()
+# static, built once; context and question go in the user message
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+SYSTEM_PROMPT_TOKENS = count_tokens(SYSTEM_PROMPT)
+# the MANDATORY FALLBACK RULE text (keep in sync), also served when the LLM is unavailable
+FALLBACK_ANSWER = (
+    "Based on the available information, I am unable to provide a specific answer.\n"
+    "Please contact your insurance provider for further assistance."
+)
+FALLBACK_PREFIX = FALLBACK_ANSWER.splitlines()[0]
+# part of the answer-cache key: editing the prompt retires cached answers
+PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:12]
+# =========================
+# FAQ DATA (rebuilt together with the handbook)
+# =========================
+FAQ_PAIRS: List = []
+FAQ_QUESTIONS: List[str] = []
+FAQ_EMBEDDINGS = None
+FAQ_MATRIX = np.zeros((0, 0), dtype=np.float32)
+FAQ_INDEX: Dict[str, Dict[str, str]] = {}
+FAQ_STATS = {"requests": 0, "exact_hits": 0, "semantic_hits": 0}
 
-CONTEXT:
-{context}
 
-USER QUESTION:
-{question}
-"""
-# ========================
-# UTILS
-# =========================
-def normalize(text: str) -> str:
-    text = text.lower().strip()
-    text = re.sub(r"[^a-z0-9\s]", "", text)
-    return re.sub(r"\s+", " ", text)
+FAQ_SOURCE = "handbook"
+
+
+def set_faq_data(hb: handbook.Handbook, matrix: np.ndarray | None = None):
+    """Exact-match structures now; the semantic matrix if already known."""
+    global FAQ_PAIRS, FAQ_QUESTIONS, FAQ_EMBEDDINGS, FAQ_MATRIX, FAQ_INDEX
+
+    handbook.set_handbook(hb)
+    FAQ_PAIRS = list(zip(hb.questions, hb.answers))
+    FAQ_QUESTIONS = list(hb.questions)
+    FAQ_INDEX = build_exact_index(hb.to_nested())
+    READINESS["faq_index"] = True
+
+    if matrix is not None:
+        FAQ_EMBEDDINGS = FAQ_MATRIX = matrix
+    else:
+        FAQ_EMBEDDINGS, FAQ_MATRIX = None, np.zeros((0, 0), dtype=np.float32)
+    READINESS["faq_embeddings"] = matrix is not None
+
+
+def encode_faq_questions():
+    global FAQ_EMBEDDINGS, FAQ_MATRIX
+
+    FAQ_EMBEDDINGS = encode_documents(get_embedder(), FAQ_QUESTIONS, doc_embedding_cache)
+    FAQ_MATRIX = normalize_rows(FAQ_EMBEDDINGS)
+    READINESS["faq_embeddings"] = True
+
+
+def load_faq_data():
+    """
+    Startup: FAQ data and matrix from ingest.py's artifacts (no parsing, no
+    model); otherwise parse the handbook now and let warm_up encode it.
+    """
+    global FAQ_SOURCE
+
+    if FAQ_ARTIFACT_DIR:
+        try:
+            nested, matrix = load_faq_artifacts(FAQ_ARTIFACT_DIR, EMBED_MODEL_ID)
+            set_faq_data(handbook.Handbook.from_nested(nested), matrix)
+            FAQ_SOURCE = "artifacts"
+            return
+        except FileNotFoundError:
+            pass
+        except ValueError as exc:
+            print(f"[faq] ignoring stale artifacts in {FAQ_ARTIFACT_DIR} — {exc}")
+
+    set_faq_data(handbook.get_handbook())
+    FAQ_SOURCE = "handbook"
+
+
+load_faq_data()
+# corpus version the FAQ data above was loaded at
+_faq_corpus_version = corpus_version.current()
+_faq_reload_lock = asyncio.Lock()
+
+
+def reload_faq_data():
+    """
+    (Re)build every FAQ structure derived from the handbooks: from the
+    artifacts ingest.py just wrote, else by re-parsing HANDBOOK_FILES.
+    """
+    handbook.reset_handbooks()
+    load_faq_data()
+    if READINESS["embedder"] and not READINESS["faq_embeddings"]:
+        encode_faq_questions()
+
+
+async def refresh_faq_data():
+    """Reload FAQ data once per new corpus version (re-ingest); tenant corpora reload lazily."""
+    global _faq_corpus_version
+
+    if corpus_version.current() == _faq_corpus_version:
+        return
+    async with _faq_reload_lock:
+        version = corpus_version.current()
+        if version == _faq_corpus_version:
+            return
+        with STAGE_SECONDS.time(stage="faq_reload"):
+            await run_in_threadpool(reload_faq_data)
+        tenant_faqs.clear()
+        _faq_corpus_version = version
+        print(f"[faq] reloaded for corpus version {version}: {len(FAQ_PAIRS)} FAQs from {FAQ_SOURCE}")
 
 # =========================
-# FAQ RETRIEVAL-K
+# TENANT FAQ DATA (one per tenant/product corpus, loaded lazily, LRU)
 # =========================
-def build_faq_pairs() -> List[Tuple[str, str]]:
-    pairs = []
-    for _, items in NESTED_DATA.items():
-        for q, a in items.items():
-            if isinstance(a, str):
-                pairs.append((q, a))
-    return pairs
+tenant_faqs = TenantCache(TENANT_CACHE_SIZE, int(TENANT_CACHE_MB * 2**20), sizeof=lambda faq: faq.nbytes)
+tenant_flights = SingleFlight()
+
+
+def request_corpus(tenant: str | None, product: str | None) -> str | None:
+    try:
+        return handbook.corpus_key(tenant, product)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-FAQ_PAIRS = build_faq_pairs()
-FAQ_QUESTIONS = [q for q, _ in FAQ_PAIRS]
-FAQ_EMBEDDINGS = embedder.encode(FAQ_QUESTIONS)
 
-def get_exact_faq_answer(question: str) -> str | None:
+def load_corpus_faq(corpus: str) -> CorpusFaq:
+    """
+    FAQ_ARTIFACT_DIR/<corpus> artifacts (memory-mapped matrix), else parse the
+    corpus's handbooks and encode their questions. KeyError if not configured.
+    """
+    if FAQ_ARTIFACT_DIR:
+        try:
+            nested, matrix = load_faq_artifacts(Path(FAQ_ARTIFACT_DIR) / corpus, EMBED_MODEL_ID)
+            return CorpusFaq(corpus, handbook.Handbook.from_nested(nested), matrix, "artifacts")
+        except FileNotFoundError:
+            pass
+        except ValueError as exc:
+            print(f"[faq] ignoring stale artifacts for {corpus} — {exc}")
+
+    files = handbook.corpus_files().get(corpus)
+    if not files:
+        raise KeyError(corpus)
+    hb = handbook.load_corpus(files)
+    matrix = normalize_rows(encode_documents(get_embedder(), list(hb.questions), doc_embedding_cache))
+    return CorpusFaq(corpus, hb, matrix, "handbook")
+
+
+async def get_corpus_faq(corpus: str | None) -> CorpusFaq | None:
+    """The corpus's FAQ tiers (None = the merged default); 404 for an unknown corpus."""
+    await refresh_faq_data()
+    if corpus is None:
+        return None
+    faq = tenant_faqs.get(corpus)
+    if faq is not None:
+        return faq
+
+    async def load() -> CorpusFaq:
+        with STAGE_SECONDS.time(stage="tenant_load"):
+            loaded = await run_in_threadpool(load_corpus_faq, corpus)
+        tenant_faqs.put(corpus, loaded)
+        print(f"[tenant] loaded {corpus}: {len(loaded)} FAQs from {loaded.source}")
+        return loaded
+
+    try:
+        return await tenant_flights.do(corpus, load)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant/product: {corpus}")
+
+
+def get_exact_faq_answer(question: str, faq: CorpusFaq | None = None) -> str | None:
     """
     Fetch answer ONLY if question exactly exists
-    in NESTED_DATA (single source of truth).
+    in the handbook (single source of truth).
     """
-    q_norm = normalize(question)
+    if faq is not None:
+        return faq.exact(question)
+    hit = FAQ_INDEX.get(normalize(question))
+    return hit["answer"] if hit else None
+
+# =========================
+# FAQ RETRIEVAL-K (semantic tier)
+# =========================
+async def embed_question(question: str) -> np.ndarray:
+    """Cached, micro-batched, L2-normalized query vector."""
+    with STAGE_SECONDS.time(stage="embed"):
+        return await query_encoder.encode(question)
 
-    for section, qa_map in NESTED_DATA.items():
-        for faq_q, faq_a in qa_map.items():
-            if normalize(faq_q) == q_norm:
-                return faq_a
 
-    return None
+def get_semantic_faq_answer(vector: np.ndarray, faq: CorpusFaq | None = None) -> Tuple[str, float] | None:
+    """
+    Closest FAQ question by cosine similarity.
+    Returns (answer, score) only if the best of the top-k clears FAQ_SIM_THRESHOLD.
+    """
+    if faq is not None:
+        return faq.semantic(vector, FAQ_RETRIEVAL_K, FAQ_SIM_THRESHOLD)
+    matches = top_k_similar(FAQ_MATRIX, vector, FAQ_RETRIEVAL_K)
+    if not matches:
+        return None
+
+    best_idx, best_score = matches[0]
+    if best_score < FAQ_SIM_THRESHOLD:
+        return None
+    return FAQ_PAIRS[best_idx][1], best_score
 
 # =========================
-# QDRANT RETRIEVAL
+# CONTEXT RETRIEVAL (Qdrant or in-process index)
 # =========================
-def retrieve_from_qdrant(question: str, k: int = 4) -> List[str]:
-    vector = embedder.encode(question).tolist()
+# collection (or local index) -> (corpus version, BM25 over its chunks)
+lexical_indexes = TenantCache(TENANT_CACHE_SIZE)
+_lexical_lock = asyncio.Lock()
+
 
-    result = qdrant.query_points(
-        collection_name=QDRANT_COLLECTION,
-        query=vector,
+async def get_lexical_index(corpus: str | None = None) -> BM25Index | None:
+    """
+    BM25 over the same chunks the retriever serves for `corpus` (one per
+    collection). Built on first use and rebuilt when the corpus version changes.
+    """
+    if not HYBRID_ENABLED:
+        return None
+    partition, _ = retriever.route(corpus)
+    version = corpus_version.current()
+    cached = lexical_indexes.get(partition)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    async with _lexical_lock:
+        cached = lexical_indexes.get(partition)
+        if cached is None or cached[0] != version:
+            payloads = await retriever.all_payloads(corpus)
+            cached = (version, await run_in_threadpool(BM25Index, payloads))
+            lexical_indexes.put(partition, cached)
+    return cached[1]
+
+
+async def timed(stage: str, awaitable):
+    with STAGE_SECONDS.time(stage=stage):
+        return await awaitable
+
+
+async def retrieve_chunks(question: str, k: int = RAG_TOP_K, vector: np.ndarray | None = None,
+                          corpus: str | None = None) -> List[Hit]:
+    if vector is None:
+        vector = await embed_question(question)
+
+    try:
+        bm25 = await get_lexical_index(corpus)
+    except Exception:
+        bm25 = None
+    if not bm25:
+        return await timed("dense_search", retriever.search(vector, k, corpus))
+
+    _, corpus_filter = retriever.route(corpus)
+    dense, lexical = await asyncio.gather(
+        timed("dense_search", retriever.search(vector, HYBRID_CANDIDATES, corpus)),
+        timed("bm25_search", run_in_threadpool(bm25.search, question, HYBRID_CANDIDATES, corpus_filter)),
+    )
+    return fuse_hits(dense, lexical, k)
+
+
+def fuse_hits(dense: List[Hit], lexical: List[Hit], k: int) -> List[Hit]:
+    return reciprocal_rank_fusion(
+        [dense, lexical],
+        [HYBRID_DENSE_WEIGHT, HYBRID_LEXICAL_WEIGHT],
         limit=k,
-        with_payload=True,
+        rrf_k=HYBRID_RRF_K,
     )
 
-    return [
-        point.payload.get("text", "")
-        for point in result.points
-        if point.payload and "text" in point.payload
-    ]
+
+async def retrieve_chunks_batch(questions: List[str], vectors: np.ndarray,
+                                k: int = RAG_TOP_K, corpus: str | None = None) -> List[List[Hit]]:
+    """retrieve_chunks for many questions: one batched vector search."""
+    try:
+        bm25 = await get_lexical_index(corpus)
+    except Exception:
+        bm25 = None
+    if not bm25:
+        return await timed("dense_search", retriever.search_batch(vectors, k, corpus))
+
+    _, corpus_filter = retriever.route(corpus)
+    dense, lexical = await asyncio.gather(
+        timed("dense_search", retriever.search_batch(vectors, HYBRID_CANDIDATES, corpus)),
+        timed("bm25_search", run_in_threadpool(
+            lambda: [bm25.search(q, HYBRID_CANDIDATES, corpus_filter) for q in questions]
+        )),
+    )
+    return [fuse_hits(d, l, k) for d, l in zip(dense, lexical)]
 
 # =========================
 # GROQ LLM (RAG)
 # =========================
-def ask_groq_llm(question: str, context_chunks: List[str]) -> str:
-    context = "\n\n".join(context_chunks)
+CONTEXT_STATS = {"requests": 0, "chunks_in": 0, "chunks_used": 0, "context_tokens": 0, "input_tokens": 0}
+
+
+def build_llm_payload(question: str, hits: List[Hit], stream: bool = False) -> Tuple[dict, int]:
+    """
+    (request body, estimated input tokens): retrieved hits are deduplicated
+    and packed best-first into CONTEXT_TOKEN_BUDGET.
+    """
+    with STAGE_SECONDS.time(stage="context"):
+        context = assemble_context(hits, CONTEXT_TOKEN_BUDGET)
+    user_content = f"Context:\n{context.text}\n\nQuestion:\n{question}"
+    input_tokens = SYSTEM_PROMPT_TOKENS + count_tokens(user_content)
+
+    CONTEXT_STATS["requests"] += 1
+    CONTEXT_STATS["chunks_in"] += len(hits)
+    CONTEXT_STATS["chunks_used"] += len(context.hits)
+    CONTEXT_STATS["context_tokens"] += context.tokens
+    CONTEXT_STATS["input_tokens"] += input_tokens
 
     payload = {
         "model": GROQ_MODEL,
         "messages": [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {
-                "role": "user",
-                "content": f"Context:\n{context}\n\nQuestion:\n{question}",
-            },
+            SYSTEM_MESSAGE,
+            {"role": "user", "content": user_content},
         ],
         "temperature": 0.2,
         "max_tokens": GROQ_MAX_TOKENS,
     }
+    if stream:
+        payload["stream"] = True
+    return payload, input_tokens
 
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json",
-    }
 
-    res = requests.post(
-        f"{GROQ_BASE_URL}/openai/v1/chat/completions",
-        headers=headers,
-        json=payload,
-        timeout=30,
-    )
-    res.raise_for_status()
-    return res.json()["choices"][0]["message"]["content"]
+def groq_error_reason(exc: BaseException) -> str:
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return f"http_{exc.status}"
+    if isinstance(exc, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(exc, aiohttp.ClientConnectionError):
+        return "connection"
+    return exc.__class__.__name__
+
+
+def record_groq_call(mode: str, exc: BaseException | None = None):
+    GROQ_REQUESTS_TOTAL.inc(mode=mode, outcome="error" if exc else "ok")
+    if exc:
+        GROQ_ERRORS_TOTAL.inc(reason=groq_error_reason(exc))
+
+
+def record_groq_usage(usage: Dict, estimated_prompt_tokens: int) -> int:
+    """Count tokens; returns prompt tokens (reported, else estimated)."""
+    prompt_tokens = usage.get("prompt_tokens", estimated_prompt_tokens)
+    GROQ_TOKENS_TOTAL.inc(prompt_tokens, kind="prompt")
+    if "completion_tokens" in usage:
+        GROQ_TOKENS_TOTAL.inc(usage["completion_tokens"], kind="completion")
+    return prompt_tokens
+
+
+async def ask_groq_llm(question: str, hits: List[Hit]) -> Tuple[str, int]:
+    """(answer, input tokens) — Groq's prompt_tokens when reported, else our estimate."""
+    if not GROQ_API_KEY:
+        raise LLMUnavailable("no_api_key")
+    payload, input_tokens = build_llm_payload(question, hits)
+
+    async def post() -> dict:
+        try:
+            async with groq_http.post("/openai/v1/chat/completions", json=payload) as res:
+                data = await res.json()
+        except Exception as exc:
+            record_groq_call("complete", exc)
+            raise
+        record_groq_call("complete")
+        return data
+
+    with STAGE_SECONDS.time(stage="llm"):
+        data = await groq_client.call(post, cost=input_tokens, hedge=True)
+    usage = data.get("usage") or {}
+    groq_client.charge(usage.get("completion_tokens", 0))
+    input_tokens = record_groq_usage(usage, input_tokens)
+    return data["choices"][0]["message"]["content"], input_tokens
+
+
+async def stream_groq_llm(question: str, hits: List[Hit], usage: Dict | None = None) -> AsyncIterator[str]:
+    """
+    Yield content deltas from Groq's OpenAI-compatible SSE stream.
+    `usage`, if given, receives input_tokens (and output_tokens when Groq
+    reports usage on the final chunk). Retries/breaker/quota apply until
+    the response starts (LLMUnavailable before the first token); streams
+    are not hedged.
+    """
+    if not GROQ_API_KEY:
+        raise LLMUnavailable("no_api_key")
+    payload, input_tokens = build_llm_payload(question, hits, stream=True)
+    usage = {} if usage is None else usage
+    usage["input_tokens"] = input_tokens
+    reported = {}
+
+    async def open_stream() -> aiohttp.ClientResponse:
+        try:
+            return await groq_http.post("/openai/v1/chat/completions", json=payload)
+        except Exception as exc:
+            record_groq_call("stream", exc)
+            raise
+
+    started = time.perf_counter()
+    first_token = True
+    res = await groq_client.call(open_stream, cost=input_tokens)
+    try:
+        async with res:
+            async for raw in res.content:
+                line = raw.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                reported = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage") or reported
+                choices = chunk.get("choices") or [{}]
+                token = choices[0].get("delta", {}).get("content")
+                if token:
+                    if first_token:
+                        STAGE_SECONDS.observe(time.perf_counter() - started, stage="llm_first_token")
+                        first_token = False
+                    yield token
+    except Exception as exc:
+        record_groq_call("stream", exc)
+        groq_client.breaker.record_failure()
+        raise
+    STAGE_SECONDS.observe(time.perf_counter() - started, stage="llm")
+    record_groq_call("stream")
+    groq_client.charge(reported.get("completion_tokens", 0))
+    usage["input_tokens"] = record_groq_usage(reported, input_tokens)
+    if "completion_tokens" in reported:
+        usage["output_tokens"] = reported["completion_tokens"]
+
+# =========================
+# ANSWER CACHE
+# =========================
+_cached_corpus_version = None
+
+
+async def cache_io(fn, *args):
+    """AnswerCache call: in the threadpool when it has to touch SQLite, else inline."""
+    if answer_cache.has_disk:
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
+
+
+async def answer_cache_key(question: str, corpus: str | None = None) -> Tuple[str, str]:
+    """
+    (cache key, corpus version) for a RAG answer from `corpus` (None = all).
+    A new corpus version (re-ingest) purges entries from the old one.
+    """
+    global _cached_corpus_version
+
+    version = corpus_version.current()
+    if version != _cached_corpus_version:
+        _cached_corpus_version = version
+        await cache_io(answer_cache.invalidate_except, version)
+
+    key = make_cache_key(normalize(question), GROQ_MODEL, PROMPT_VERSION, version, corpus)
+    return key, version
+
+def llm_fallback(exc: LLMUnavailable) -> str:
+    LLM_FALLBACKS_TOTAL.inc(reason=exc.reason)
+    return FALLBACK_ANSWER
+
+# =========================
+# REQUEST COALESCING
+# =========================
+# concurrent RAG requests with the same answer-cache key (normalized question,
+# model, prompt, corpus version, tenant/product) share one retrieval + Groq call
+rag_flights = SingleFlight()
+
+
+def require_context(hits: List[Hit], corpus: str | None):
+    """A routed corpus with nothing indexed: the fallback, without asking Groq to answer from nothing."""
+    if corpus is not None and not hits:
+        raise LLMUnavailable("no_context")
+
+
+async def answer_with_rag(question: str, vector: np.ndarray | None, cache_key: str, version: str,
+                          hits: List[Hit] | None = None, corpus: str | None = None) -> Tuple[str, int]:
+    if hits is None:
+        hits = await retrieve_chunks(question, vector=vector, corpus=corpus)
+    try:
+        require_context(hits, corpus)
+        answer, input_tokens = await ask_groq_llm(question, hits)
+    except LLMUnavailable as exc:
+        # not cached: the next request should get a real answer once Groq is back
+        return llm_fallback(exc), None
+    await cache_io(answer_cache.set, cache_key, answer, version)
+    return answer, input_tokens
 
 # =========================
 # ROUTE
 # =========================
-@app.post("/ask", response_model=AskResponse)
-def ask(req: AskRequest):
+async def answer_from_faq(question: str, corpus: str | None = None) -> Tuple[AskResponse | None, np.ndarray | None]:
+    """
+    Exact then semantic FAQ tier (of `corpus`, else the merged handbook).
+    Returns (response, None) on a hit, else (None, query vector) for the RAG path.
+    """
+    faq = await get_corpus_faq(corpus)
+    FAQ_STATS["requests"] += 1
 
 # 2️⃣ EXACT FAQ from nested data (SAFE & CORRECT)
-    faq_answer = get_exact_faq_answer(req.question)
+    with STAGE_SECONDS.time(stage="faq_exact"):
+        faq_answer = get_exact_faq_answer(question, faq)
     if faq_answer:
-        return AskResponse(answer=faq_answer, source="faq-exact")
+        FAQ_STATS["exact_hits"] += 1
+        return AskResponse(answer=faq_answer, source="faq-exact"), None
+
+    # 2️⃣b SEMANTIC FAQ (paraphrases of a handbook question)
+    vector = await embed_question(question)
+    with STAGE_SECONDS.time(stage="faq_semantic"):
+        semantic = get_semantic_faq_answer(vector, faq)
+    if semantic:
+        FAQ_STATS["semantic_hits"] += 1
+        answer, score = semantic
+        return AskResponse(answer=answer, source="faq-semantic", score=round(score, 4)), None
+
+    return None, vector
+
+
+
+def record_answer(route: str, response: AskResponse, started: float) -> AskResponse:
+    source = response.source
+    if response.answer.lstrip('"').startswith(FALLBACK_PREFIX):
+        source = "fallback"
+    ANSWERS_TOTAL.inc(route=route, source=source, cached=str(response.cached).lower())
+    REQUEST_SECONDS.observe(time.perf_counter() - started, route=route, source=source)
+    return response
+
+
+async def cached_answer(cache_key: str) -> str | None:
+    """Memory hits inline; the SQLite level (if any) off the event loop."""
+    with STAGE_SECONDS.time(stage="answer_cache"):
+        answer = answer_cache.get_memory(cache_key)
+        if answer is None:
+            answer = await cache_io(answer_cache.get, cache_key)
+        return answer
 
 
-    # 3️⃣ Qdrant + Groq
-    chunks = retrieve_from_qdrant(req.question)
-    llm_answer = ask_groq_llm(req.question, chunks)
+@app.post("/ask", response_model=AskResponse)
+async def ask(req: AskRequest):
+    started = time.perf_counter()
+    corpus = request_corpus(req.tenant, req.product)
+    faq_response, vector = await answer_from_faq(req.question, corpus)
+    if faq_response:
+        return record_answer("ask", faq_response, started)
+
+    # 3️⃣ Qdrant + Groq (cached per normalized question / model / prompt / corpus)
+    cache_key, version = await answer_cache_key(req.question, corpus)
+    cached = await cached_answer(cache_key)
+    if cached is not None:
+        return record_answer("ask", AskResponse(answer=cached, source="qdrant+groq", cached=True), started)
+
+    llm_answer, input_tokens = await rag_flights.do(
+        cache_key, lambda: answer_with_rag(req.question, vector, cache_key, version, corpus=corpus)
+    )
+    return record_answer(
+        "ask", AskResponse(answer=llm_answer, source="qdrant+groq", input_tokens=input_tokens), started
+    )
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# leader streams still running (kept referenced until they finish)
+_stream_tasks = set()
+
+
+async def stream_answer(question: str, vector: np.ndarray | None, corpus: str | None, cache_key: str,
+                        version: str, tokens: asyncio.Queue, usage: Dict, started: float) -> Tuple[str, str | None]:
+    """
+    Leader of a streamed RAG answer. Runs to the end even when its SSE client
+    goes away: fills the answer cache and always resolves the flight with an
+    answer (the fallback on failure), so coalesced requests never inherit the
+    leader's errors. Tokens go to `tokens`, then None.
+    Returns ("done", None), ("fallback", answer) or ("error", detail).
+    """
+    flight = rag_flights.lead(cache_key)
+    parts = []
+    try:
+        hits = await retrieve_chunks(question, vector=vector, corpus=corpus)
+        require_context(hits, corpus)
+        async for token in stream_groq_llm(question, hits, usage):
+            parts.append(token)
+            tokens.put_nowait(token)
+        answer = "".join(parts)
+        await cache_io(answer_cache.set, cache_key, answer, version)
+        flight.set_result((answer, usage.get("input_tokens")))
+        record_answer("stream", AskResponse(answer=answer, source="qdrant+groq"), started)
+        return "done", None
+    except LLMUnavailable as exc:
+        answer = llm_fallback(exc)
+        flight.set_result((answer, None))
+        record_answer("stream", AskResponse(answer=answer, source="qdrant+groq"), started)
+        return "fallback", answer
+    except Exception as exc:
+        # this client already has part of the answer: tell it; followers get the fallback
+        flight.set_result((llm_fallback(LLMUnavailable(upstream_reason(exc))), None))
+        record_answer("stream", AskResponse(answer="".join(parts), source="error"), started)
+        return "error", str(exc) or exc.__class__.__name__
+    finally:
+        if not flight.done():
+            # cancelled (shutdown)
+            flight.set_result((llm_fallback(LLMUnavailable("aborted")), None))
+        tokens.put_nowait(None)
+
+
+@app.post("/ask/stream")
+async def ask_stream(req: AskRequest):
+    """
+    Same tiers as /ask, as Server-Sent Events:
+    - FAQ hits: one `answer` event
+    - RAG: `token` events as Groq produces them, then `done`
+    """
+    started = time.perf_counter()
+    corpus = request_corpus(req.tenant, req.product)
+    # an unknown corpus is a 404 before the stream starts
+    await get_corpus_faq(corpus)
+
+    async def events() -> AsyncIterator[str]:
+        faq_response, vector = await answer_from_faq(req.question, corpus)
+        if faq_response:
+            yield sse_event("answer", record_answer("stream", faq_response, started).model_dump())
+            return
+
+        cache_key, version = await answer_cache_key(req.question, corpus)
+        cached = await cached_answer(cache_key)
+        if cached is not None:
+            response = AskResponse(answer=cached, source="qdrant+groq", cached=True)
+            yield sse_event("answer", record_answer("stream", response, started).model_dump())
+            return
+
+        # same question already being answered: wait for it, send it whole
+        in_flight = rag_flights.join(cache_key)
+        if in_flight is not None:
+            try:
+                answer, input_tokens = await asyncio.shield(in_flight)
+            except Exception as exc:
+                record_answer("stream", AskResponse(answer="", source="error"), started)
+                yield sse_event("error", {"detail": str(exc) or exc.__class__.__name__})
+                return
+            response = AskResponse(answer=answer, source="qdrant+groq", input_tokens=input_tokens)
+            yield sse_event("answer", record_answer("stream", response, started).model_dump())
+            return
+
+        # the Groq stream runs as its own task; this response only relays its tokens
+        tokens: asyncio.Queue = asyncio.Queue()
+        usage = {}
+        task = asyncio.create_task(
+            stream_answer(req.question, vector, corpus, cache_key, version, tokens, usage, started)
+        )
+        _stream_tasks.add(task)
+        task.add_done_callback(_stream_tasks.discard)
+
+        ttft_ms = None
+        while (token := await tokens.get()) is not None:
+            if ttft_ms is None:
+                ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+            yield sse_event("token", {"token": token})
+
+        outcome, detail = await task
+        if outcome == "fallback":
+            # LLM unavailable before the first token: the fallback, whole and uncached
+            response = AskResponse(answer=detail, source="qdrant+groq")
+            yield sse_event("answer", response.model_dump())
+        elif outcome == "error":
+            yield sse_event("error", {"detail": detail})
+        else:
+            yield sse_event("done", {"source": "qdrant+groq", "ttft_ms": ttft_ms, **usage})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# =========================
+# BATCH
+# =========================
+def ms_since(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+async def answer_batch(items: List[BatchItem], concurrency: int = BATCH_LLM_CONCURRENCY,
+                       corpus: str | None = None) -> AsyncIterator[Dict]:
+    """
+    Answer many questions with shared work, yielding one result dict per
+    item as soon as it is ready (FAQ and cached answers first):
+    exact tier -> one encode for all -> vectorized semantic FAQ ->
+    answer cache -> one batched retrieval -> Groq with bounded concurrency.
+    """
+    started = time.perf_counter()
+
+    def result(i: int, response: AskResponse | None, timings: Dict, error: str | None = None) -> Dict:
+        out = {"id": items[i].id if items[i].id is not None else str(i), "question": items[i].question}
+        if response is not None:
+            out.update(record_answer("batch", response, started).model_dump())
+        if error is not None:
+            out["error"] = error
+        out["timings_ms"] = {**timings, "total_ms": ms_since(started)}
+        return out
+
+    faq = await get_corpus_faq(corpus)
+    FAQ_STATS["requests"] += len(items)
+    pending = []
+    for i, item in enumerate(items):
+        faq_answer = get_exact_faq_answer(item.question, faq)
+        if faq_answer:
+            FAQ_STATS["exact_hits"] += 1
+            yield result(i, AskResponse(answer=faq_answer, source="faq-exact"), {})
+        else:
+            pending.append(i)
+    if not pending:
+        return
+
+    t = time.perf_counter()
+    with STAGE_SECONDS.time(stage="embed"):
+        vectors = await query_encoder.encode_many([items[i].question for i in pending])
+    timings = {"embed_ms": ms_since(t)}
+
+    best = top_k_similar_batch(faq.matrix if faq else FAQ_MATRIX, vectors, 1)
+    rag, rag_vectors = [], []
+    for i, vector, matches in zip(pending, vectors, best):
+        if matches and matches[0][1] >= FAQ_SIM_THRESHOLD:
+            FAQ_STATS["semantic_hits"] += 1
+            idx, score = matches[0]
+            answer = faq.answers[idx] if faq else FAQ_PAIRS[idx][1]
+            yield result(i, AskResponse(answer=answer, source="faq-semantic", score=round(score, 4)), timings)
+            continue
+
+        cache_key, version = await answer_cache_key(items[i].question, corpus)
+        cached = await cached_answer(cache_key)
+        if cached is not None:
+            yield result(i, AskResponse(answer=cached, source="qdrant+groq", cached=True), timings)
+            continue
+        rag.append((i, cache_key, version))
+        rag_vectors.append(vector)
+    if not rag:
+        return
+
+    t = time.perf_counter()
+    try:
+        hits_batch = await retrieve_chunks_batch(
+            [items[i].question for i, _, _ in rag], np.stack(rag_vectors), corpus=corpus
+        )
+    except Exception as exc:
+        for i, _, _ in rag:
+            yield result(i, None, timings, error=str(exc) or exc.__class__.__name__)
+        return
+    timings = {**timings, "retrieve_ms": ms_since(t)}
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def generate(i: int, cache_key: str, version: str, hits: List[Hit]) -> Dict:
+        async with semaphore:
+            t = time.perf_counter()
+            question = items[i].question
+            try:
+                answer, input_tokens = await rag_flights.do(
+                    cache_key, lambda: answer_with_rag(question, None, cache_key, version, hits, corpus)
+                )
+            except Exception as exc:
+                return result(i, None, {**timings, "llm_ms": ms_since(t)},
+                              error=str(exc) or exc.__class__.__name__)
+            response = AskResponse(answer=answer, source="qdrant+groq", input_tokens=input_tokens)
+            return result(i, response, {**timings, "llm_ms": ms_since(t)})
+
+    tasks = [asyncio.ensure_future(generate(i, key, version, hits))
+             for (i, key, version), hits in zip(rag, hits_batch)]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@app.post("/ask/batch")
+async def ask_batch(req: BatchAskRequest):
+    """
+    Answer up to BATCH_MAX_ITEMS questions; streams one JSON object per line
+    (id, question, answer, source, ..., timings_ms) in completion order.
+    """
+    if len(req.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_ITEMS} items per batch")
+    concurrency = min(req.concurrency or BATCH_LLM_CONCURRENCY, BATCH_LLM_CONCURRENCY)
+    corpus = request_corpus(req.tenant, req.product)
+    await get_corpus_faq(corpus)
+
+    async def lines() -> AsyncIterator[str]:
+        async for item in answer_batch(req.items, concurrency, corpus):
+            yield json.dumps(item) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def faq_stats() -> Dict[str, float]:
+    total = FAQ_STATS["requests"] or 1
+    return {
+        **FAQ_STATS,
+        "exact_hit_rate": round(FAQ_STATS["exact_hits"] / total, 4),
+        "semantic_hit_rate": round(FAQ_STATS["semantic_hits"] / total, 4),
+        "sim_threshold": FAQ_SIM_THRESHOLD,
+    }
+
+async def retriever_counts() -> Dict[str, int] | None:
+    """Chunks per collection the configured corpora route to (None if the retriever is down)."""
+    try:
+        return await retriever.counts(handbook.corpus_files())
+    except Exception:
+        return None
+
+
+async def retriever_points() -> int | None:
+    counts = await retriever_counts()
+    return None if counts is None else sum(counts.values())
 
-    return AskResponse(answer=llm_answer, source="qdrant+groq")
 
 @app.get("/status")
-def status():
+async def status():
     return {
         "faq_count": len(FAQ_PAIRS),
+        "faq_source": FAQ_SOURCE,
+        "faq_stats": faq_stats(),
+        "answer_cache": await cache_io(answer_cache.stats),
+        "coalescing": {**rag_flights.stats, "in_flight": len(rag_flights)},
+        "context": {
+            **CONTEXT_STATS,
+            "budget_tokens": CONTEXT_TOKEN_BUDGET,
+            "system_prompt_tokens": SYSTEM_PROMPT_TOKENS,
+        },
+        "query_embeddings": {
+            "backend": EMBED_BACKEND,
+            **query_encoder.stats,
+            "cache_entries": len(query_encoder.cache),
+        },
+        "corpus_version": corpus_version.current(),
+        "retriever_backend": retriever.name,
+        "hybrid_bm25_docs": sum(len(bm25) for _, bm25 in lexical_indexes.values()),
         "qdrant_collection": QDRANT_COLLECTION,
-        "qdrant_points": "412",
+        "tenants": {
+            "routing": TENANT_ROUTING,
+            "faq_cache": tenant_faqs.stats(),
+            "loaded": [faq.corpus for faq in tenant_faqs.values()],
+            "lexical_indexes": len(lexical_indexes),
+        },
+        "qdrant_profile": getattr(retriever, "profile", {}).get("name"),
+        "qdrant_points": await retriever_points(),
         "llm_model": GROQ_MODEL,
+        "llm_client": groq_client.status(),
     }
+@app.get("/metrics")
+async def prometheus_metrics():
+    cache = await cache_io(answer_cache.stats)
+    ANSWER_CACHE_LOOKUPS.set(cache["memory_hits"], result="memory_hit")
+    ANSWER_CACHE_LOOKUPS.set(cache["disk_hits"], result="disk_hit")
+    ANSWER_CACHE_LOOKUPS.set(cache["misses"], result="miss")
+    ANSWER_CACHE_ENTRIES.set(cache["memory_entries"], layer="memory")
+    if "disk_entries" in cache:
+        ANSWER_CACHE_ENTRIES.set(cache["disk_entries"], layer="disk")
+
+    embed = query_encoder.stats
+    QUERY_EMBED_REQUESTS.set(embed["cache_hits"], result="cache_hit")
+    QUERY_EMBED_REQUESTS.set(embed["requests"] - embed["cache_hits"], result="encoded")
+    QUERY_EMBED_BATCHES.set(embed["batches"])
+
+    GROQ_CLIENT_EVENTS.set(groq_client.stats["retries"], event="retry")
+    GROQ_CLIENT_EVENTS.set(groq_client.stats["hedges"], event="hedge")
+    GROQ_CLIENT_EVENTS.set(groq_client.stats["hedge_wins"], event="hedge_win")
+    GROQ_CIRCUIT_OPEN.set(int(groq_client.breaker.state == "open"))
+
+    RAG_CALLS.set(rag_flights.stats["executions"], result="executed")
+    RAG_CALLS.set(rag_flights.stats["coalesced"], result="coalesced")
+
+    for collection, points in (await retriever_counts() or {}).items():
+        RETRIEVER_POINTS.set(points, backend=retriever.name, collection=collection)
+
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: FAQ data, embeddings, model and retriever are all usable."""
+    checks = dict(READINESS)
+    checks["retriever"] = await retriever_points() is not None
+    ready = all(checks.values())
+    return JSONResponse({"ready": ready, "checks": checks}, status_code=200 if ready else 503)
+
+
+# =========================
+# FAQ CATALOGUE (pre-serialized per handbook, paginated)
+# =========================
+# corpus -> (handbook it was built from, kind -> full CachedBody,
+# (kind, offset, limit) -> page CachedBody); a reloaded handbook (new object)
+# starts a fresh catalogue. Only full catalogues are compressed up front: pages
+# can be asked for in any number of shapes, so they are compressed on demand.
+faq_catalogues = TenantCache(TENANT_CACHE_SIZE)
+FAQ_CACHE_CONTROL = f"public, max-age={FAQ_CACHE_MAX_AGE}" if FAQ_CACHE_MAX_AGE > 0 else "no-cache"
+
+
+def faq_page(hb: handbook.Handbook, kind: str, offset: int, limit: int | None) -> Dict:
+    items = hb.faq_questions if kind == "faqs" else hb.faq_categories
+    stop = None if limit is None else offset + limit
+    return {kind: items[offset:stop], "total": len(items), "offset": offset, "limit": limit}
+
+
+def faq_body(corpus: str | None, hb: handbook.Handbook, kind: str, offset: int, limit: int | None,
+             accept_encoding: str | None) -> CachedBody:
+    """The catalogue body, with the encoding `accept_encoding` negotiates already compressed."""
+    entry = faq_catalogues.get(corpus)
+    if entry is None or entry[0] is not hb:
+        entry = (hb, {}, TenantCache(FAQ_PAGE_CACHE_SIZE))
+        faq_catalogues.put(corpus, entry)
+    _, full, pages = entry
+
+    total = len(hb.faq_questions if kind == "faqs" else hb.faq_categories)
+    # every offset past the end is the same empty page
+    offset = min(offset, total)
+    if offset == 0 and limit is None:
+        body = full.get(kind)
+        if body is None:
+            body = full[kind] = CachedBody.from_json(faq_page(hb, kind, 0, None))
+        return body
+
+    key = (kind, offset, limit)
+    body = pages.get(key)
+    if body is None:
+        body = CachedBody.from_json(faq_page(hb, kind, offset, limit), eager=False)
+        pages.put(key, body)
+    body.body(accepted_encoding(accept_encoding, body.encodings))
+    return body
+
+
+def send_cached(request: Request, route: str, body: CachedBody, cache_control: str) -> Response:
+    response, outcome = cached_response(request, body, cache_control)
+    CACHED_RESPONSES.inc(route=route, outcome=outcome)
+    CACHED_RESPONSE_BYTES.inc(len(response.body), route=route)
+    return response
+
+
+async def faq_catalogue(request: Request, kind: str, tenant: str | None, product: str | None,
+                        offset: int, limit: int | None) -> Response:
+    corpus = request_corpus(tenant, product)
+    faq = await get_corpus_faq(corpus)
+    hb = faq.handbook if faq is not None else handbook.get_handbook()
+    # serializing/compressing a large catalogue stays off the event loop
+    body = await run_in_threadpool(faq_body, corpus, hb, kind, offset, limit,
+                                   request.headers.get("accept-encoding"))
+    return send_cached(request, "/faqs" if kind == "faqs" else "/faqs/categories", body, FAQ_CACHE_CONTROL)
+
+
 @app.get("/faqs")
-def faqs():
-    return {
-        "faqs": get_faq_questions()
-    }
+async def faqs(request: Request, tenant: str | None = None, product: str | None = None,
+               offset: int = Query(0, ge=0), limit: int | None = Query(None, ge=1, le=FAQ_PAGE_MAX)):
+    """Handbook questions: {"faqs": [...], "total", "offset", "limit"}."""
+    return await faq_catalogue(request, "faqs", tenant, product, offset, limit)
+
+
+@app.get("/faqs/categories")
+async def faq_categories(request: Request, tenant: str | None = None, product: str | None = None,
+                         offset: int = Query(0, ge=0), limit: int | None = Query(None, ge=1, le=FAQ_PAGE_MAX)):
+    """Questions by section: {"categories": [{"title", "questions"}], "total", "offset", "limit"}."""
+    return await faq_catalogue(request, "categories", tenant, product, offset, limit)
+
+# =========================
+# FRONTEND (index.html, app.js, style.css from STATIC_DIR)
+# =========================
+# index.html always revalidates (cheap 304), so a deploy is picked up on the next load
+STATIC_FILES = {
+    "index.html": ("text/html; charset=utf-8", "no-cache"),
+    "app.js": ("text/javascript; charset=utf-8", f"public, max-age={STATIC_CACHE_MAX_AGE}"),
+    "style.css": ("text/css; charset=utf-8", f"public, max-age={STATIC_CACHE_MAX_AGE}"),
+}
+# name -> (file mtime, CachedBody); re-read when the file changes
+_static_bodies: Dict[str, Tuple[int, CachedBody]] = {}
+
+
+def static_body(name: str) -> CachedBody:
+    path = STATIC_DIR / name
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"{name} not found")
+    cached = _static_bodies.get(name)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, CachedBody.from_file(path, STATIC_FILES[name][0]))
+        _static_bodies[name] = cached
+    return cached[1]
+
+
+def static_response(request: Request, name: str) -> Response:
+    return send_cached(request, f"/{name}", static_body(name), STATIC_FILES[name][1])
+
+
+@app.get("/", include_in_schema=False)
+def index(request: Request):
+    return static_response(request, "index.html")
+
+
+@app.get("/app.js", include_in_schema=False)
+def app_js(request: Request):
+    return static_response(request, "app.js")
+
+
+@app.get("/style.css", include_in_schema=False)
+def style_css(request: Request):
+    return static_response(request, "style.css")
@@ -26,8 +26,8 @@ function addUser(text) {
   messagesEl.scrollTop = messagesEl.scrollHeight;
 }
 
-/* CHATGPT-LIKE TYPING */
-function typeBot(text) {
+/* BOT MESSAGE */
+function addBot() {
   const msg = document.createElement("div");
   msg.className = "message bot";
 
@@ -35,39 +35,71 @@ function typeBot(text) {
   bubble.className = "bubble";
   msg.appendChild(bubble);
   messagesEl.appendChild(msg);
+  return bubble;
+}
 
-  const formatted = formatBotText(text);
-  let i = 0;
-
-  function type() {
-    if (i < formatted.length) {
-      bubble.innerHTML = formatted.slice(0, i + 1);
-      i++;
-      messagesEl.scrollTop = messagesEl.scrollHeight;
-      setTimeout(type, 18);
-    }
-  }
+function renderBot(bubble, text) {
+  bubble.innerHTML = formatBotText(text);
+  messagesEl.scrollTop = messagesEl.scrollHeight;
+}
 
-  type();
+/* SSE FRAME -> { event, data } */
+function parseSSE(frame) {
+  let event = "message";
+  const data = [];
+  frame.split("\n").forEach(line => {
+    if (line.startsWith("event:")) event = line.slice(6).trim();
+    else if (line.startsWith("data:")) data.push(line.slice(5).trim());
+  });
+  return { event, data: data.length ? JSON.parse(data.join("\n")) : null };
 }
 
-/* ASK QUESTION */
+/* ASK QUESTION (streamed: tokens render as they arrive) */
 async function askQuestion(q) {
   addUser(q);
   inputEl.value = "";
 
+  const bubble = addBot();
+  let text = "";
+
   try {
-    const res = await fetch(`${API_BASE}/ask`, {
+    const res = await fetch(`${API_BASE}/ask/stream`, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ question: q })
     });
 
-    const data = await res.json();
-    typeBot(data.answer);
+    // 4xx/5xx: a JSON {detail} (string, or a list of validation errors), not a stream
+    if (!res.ok) {
+      const err = await res.json().catch(() => ({}));
+      const detail = typeof err.detail === "string" ? err.detail : err.detail?.[0]?.msg;
+      renderBot(bubble, detail || `Request failed (${res.status}).`);
+      return;
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let sep;
+      while ((sep = buffer.indexOf("\n\n")) !== -1) {
+        const { event, data } = parseSSE(buffer.slice(0, sep));
+        buffer = buffer.slice(sep + 2);
+
+        if (event === "answer") text = data.answer;
+        else if (event === "token") text += data.token;
+        else if (event === "error") throw new Error(data.detail);
+        renderBot(bubble, text);
+      }
+    }
 
   } catch {
-    typeBot("Unable to connect to server.");
+    renderBot(bubble, text || "Unable to connect to server.");
   }
 }
 
@@ -1,40 +1,154 @@
+import os
 import re
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# handbook parsed when nothing else (e.g. api_server FAQ artifacts) set the handbook
+HANDBOOK_FILE = os.getenv("HANDBOOK_FILE") or os.getenv("DATA_FILE") or "data/motor_insurance.txt"
+# one corpus per tenant/product: comma-separated "tenant/product=path",
+# "product=path" or just a path (corpus = file stem); a directory adds each *.txt in it.
+# ingest.py ingests exactly these (DATA_PATHS / DATA_FILE are accepted as other names)
+HANDBOOK_FILES = os.getenv("HANDBOOK_FILES") or os.getenv("DATA_PATHS") or HANDBOOK_FILE
+
+SECTION_RX = re.compile(r"\d+\.\s+(.*)")
+PAGE_SEPARATOR_RX = re.compile(r"-{5,}")
+# a Q&A whose answer ends a sentence right before a page break is complete there
+# (what follows on the next page, e.g. the TAT table after the last FAQ, is not part of it)
+SENTENCE_END = (".", "!", "?", '"')
+# tenant / product names (they become directory and collection names)
+CORPUS_PART_RX = re.compile(r"[a-z0-9][a-z0-9_.-]*")
 # ======================================================
-# BUILD NESTED DICTIONARY FROM TXT
+# COMPACT HANDBOOK
 # ======================================================
-def build_nested_dictionary(txt_file_path):
-    data = {}
-    current_section = "General"
-    data[current_section] = {}
+class Handbook:
+    """
+    Parsed handbook: interned section names and flat question/answer tuples.
+    Section i owns entries offsets[i]:offsets[i + 1]. faq_questions and
+    faq_categories are built once and shared — treat them as read-only.
+    """
+    __slots__ = ("sections", "offsets", "questions", "answers", "sources",
+                 "faq_questions", "faq_categories")
+
+    def __init__(self, sections, offsets, questions, answers, sources=()):
+        self.sections = tuple(sections)
+        self.offsets = array("I", offsets)
+        self.questions = tuple(questions)
+        self.answers = tuple(answers)
+        self.sources = tuple(sources)
+
+        self.faq_questions = [q.strip() for q in self.questions]
+        self.faq_categories = [
+            {"title": section, "questions": list(self.questions[start:stop])}
+            for section, start, stop in self.spans()
+        ]
+
+    def __len__(self):
+        return len(self.questions)
 
-    question_lines = []
-    answer_lines = []
+    def spans(self) -> Iterator[Tuple[str, int, int]]:
+        for i, section in enumerate(self.sections):
+            yield section, self.offsets[i], self.offsets[i + 1]
+
+    def items(self) -> Iterator[Tuple[str, str, str]]:
+        """(section, question, answer) in handbook order."""
+        for section, start, stop in self.spans():
+            for i in range(start, stop):
+                yield section, self.questions[i], self.answers[i]
+
+    def to_nested(self) -> Dict[str, Dict[str, str]]:
+        """The {section: {question: answer}} shape (artifacts, chunking, FAQ index)."""
+        return {
+            section: dict(zip(self.questions[start:stop], self.answers[start:stop]))
+            for section, start, stop in self.spans()
+        }
+
+    @classmethod
+    def from_nested(cls, nested: Dict[str, Dict[str, str]], sources=()) -> "Handbook":
+        builder = _HandbookBuilder()
+        for section, qa_map in nested.items():
+            section = builder.section(section)
+            for question, answer in qa_map.items():
+                builder.add(section, question, answer)
+        builder.sources.extend(sources)
+        return builder.build()
+
+
+class _HandbookBuilder:
+    """
+    Accumulates Q&A with nested-dict semantics: a repeated section continues
+    where it left off, a repeated question keeps its place.
+    """
+    def __init__(self):
+        self._sections: Dict[str, List[int]] = {}
+        self._index: Dict[Tuple[str, str], int] = {}
+        self.questions: List[str] = []
+        self.answers: List[str] = []
+        self.sources: List[str] = []
+
+    def section(self, name: str) -> str:
+        name = sys.intern(name)
+        self._sections.setdefault(name, [])
+        return name
+
+    def add(self, section: str, question: str, answer: str, replace: bool = True):
+        key = (section, question)
+        i = self._index.get(key)
+        if i is None:
+            self._index[key] = len(self.questions)
+            self._sections[section].append(len(self.questions))
+            self.questions.append(question)
+            self.answers.append(answer)
+        elif replace:
+            self.answers[i] = answer
+
+    def build(self) -> Handbook:
+        sections, offsets, questions, answers = [], [0], [], []
+        for name, entries in self._sections.items():
+            sections.append(name)
+            questions.extend(self.questions[i] for i in entries)
+            answers.extend(self.answers[i] for i in entries)
+            offsets.append(len(questions))
+        return Handbook(sections, offsets, questions, answers, self.sources)
+# ======================================================
+# PARSE HANDBOOK TXT (single pass)
+# ======================================================
+def parse_lines(lines: Iterable[str], builder: _HandbookBuilder):
+    section = builder.section("General")
+    question_lines: List[str] = []
+    answer_lines: List[str] = []
     reading_answer = False
 
-    with open(txt_file_path, "r", encoding="utf-8") as f:
-        lines = [line.rstrip() for line in f.readlines()]
+    def save():
+        if question_lines and answer_lines:
+            builder.add(section, " ".join(question_lines).strip(), " ".join(answer_lines).strip())
 
     for line in lines:
         line = line.strip()
+        first = line[:1]
 
-        # ---------- SECTION ----------
-        section_match = re.match(r"^\d+\.\s+(.*)", line)
-        if section_match:
-            current_section = section_match.group(1)
-            data.setdefault(current_section, {})
+        # ---------- PAGE SEPARATOR ----------
+        if first == "-" and PAGE_SEPARATOR_RX.fullmatch(line):
+            if reading_answer and answer_lines and answer_lines[-1].endswith(SENTENCE_END):
+                save()
+                question_lines, answer_lines, reading_answer = [], [], False
             continue
 
+        # ---------- SECTION ----------
+        if first.isdigit():
+            section_match = SECTION_RX.match(line)
+            if section_match:
+                # a new section closes any open Q&A (it belongs to the old section)
+                save()
+                question_lines, answer_lines, reading_answer = [], [], False
+                section = builder.section(section_match.group(1))
+                continue
+
         # ---------- QUESTION START ----------
         if line.startswith("Q."):
-            # save previous Q&A
-            if question_lines and answer_lines:
-                question = " ".join(question_lines).strip()
-                answer = " ".join(answer_lines).strip()
-                data[current_section][question] = answer
-
-            question_lines = [line.replace("Q.", "").strip()]
-            answer_lines = []
-            reading_answer = False
+            save()
+            question_lines, answer_lines, reading_answer = [line.replace("Q.", "").strip()], [], False
             continue
 
         # ---------- ANSWER START ----------
@@ -45,54 +159,136 @@ def build_nested_dictionary(txt_file_path):
                 answer_lines.append(content)
             continue
 
-        # ---------- QUESTION CONTINUATION ----------
-        if question_lines and not reading_answer:
-            question_lines.append(line)
-            continue
-
-        # ---------- ANSWER CONTINUATION ----------
+        # ---------- QUESTION / ANSWER CONTINUATION ----------
         if reading_answer:
             if line:
                 answer_lines.append(line)
+        elif question_lines:
+            question_lines.append(line)
 
-    # ---------- SAVE LAST ----------
-    if question_lines and answer_lines:
-        question = " ".join(question_lines).strip()
-        answer = " ".join(answer_lines).strip()
-        data[current_section][question] = answer
+    save()
 
-    return data
+
+def parse_handbook(txt_file_path) -> Handbook:
+    builder = _HandbookBuilder()
+    with open(txt_file_path, "r", encoding="utf-8") as f:
+        parse_lines(f, builder)
+    builder.sources.append(str(txt_file_path))
+    return builder.build()
+
+
+def merge_handbooks(handbooks: Iterable[Handbook]) -> Handbook:
+    """One view over several handbooks, merged by section; the first answer to a question wins."""
+    builder = _HandbookBuilder()
+    for hb in handbooks:
+        for section, start, stop in hb.spans():
+            section = builder.section(section)
+            for i in range(start, stop):
+                builder.add(section, hb.questions[i], hb.answers[i], replace=False)
+        builder.sources.extend(hb.sources)
+    return builder.build()
+
+
+def build_nested_dictionary(txt_file_path):
+    return parse_handbook(txt_file_path).to_nested()
 # ======================================================
-# FAQ QUESTIONS FOR FRONTEND
+# CORPORA (one per tenant/product)
 # ======================================================
-def get_faq_questions():
-    """
-    Return FAQ questions EXCLUDING
-    'About Motor Insurance' questions
-    """
-    questions = []
+def parse_corpus_spec(spec: str) -> Iterator[Tuple[str | None, Path]]:
+    """Comma-separated "corpus=path" or "path" entries -> (corpus or None, path)."""
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if entry:
+            corpus, _, path = entry.rpartition("=")
+            yield corpus.strip().lower() or None, Path(path.strip())
 
-    for section_name, section_data in NESTED_DATA.items():
-        for question in section_data.keys():
-            if not isinstance(question, str):
-                continue
 
-            question = question.strip()
-            questions.append(question)
+def corpus_key(tenant: str | None = None, product: str | None = None) -> str | None:
+    """"tenant/product" (or whichever is given); None = every corpus merged."""
+    parts = [p.strip().lower() for p in (tenant, product) if p and p.strip()]
+    for part in parts:
+        if not CORPUS_PART_RX.fullmatch(part):
+            raise ValueError(f"Invalid tenant/product name: {part!r}")
+    return "/".join(parts) or None
+
+
+def check_corpus(corpus: str) -> str:
+    """A corpus requests can reach (corpus_key's "tenant/product" or "product"); else ValueError."""
+    parts = corpus.split("/")
+    if len(parts) > 2 or not all(CORPUS_PART_RX.fullmatch(part) for part in parts):
+        raise ValueError(
+            f"Invalid corpus name {corpus!r}: tenant/product must match {CORPUS_PART_RX.pattern}"
+            ' (name the file\'s corpus with "tenant/product=path")'
+        )
+    return corpus
+
+
+def iter_handbook_files(spec: str = HANDBOOK_FILES) -> Iterator[Tuple[str, Path]]:
+    for corpus, path in parse_corpus_spec(spec):
+        files = sorted(path.rglob("*.txt")) if path.is_dir() else [path]
+        for file in files:
+            yield check_corpus(corpus or file.stem.lower()), file
+
 
-    return questions
+def corpus_files(spec: str = HANDBOOK_FILES) -> Dict[str, List[Path]]:
+    """corpus -> handbook files (listing only, nothing parsed)."""
+    files: Dict[str, List[Path]] = {}
+    for corpus, path in iter_handbook_files(spec):
+        files.setdefault(corpus, []).append(path)
+    return files
 
-def get_faq_categories():
-    categories = []
 
-    for section_name, section_data in NESTED_DATA.items():
-        categories.append({
-            "title": section_name,
-            "questions": list(section_data.keys())
-        })
+def load_corpus(paths: List[Path]) -> Handbook:
+    """One corpus; several files get merged."""
+    return parse_handbook(paths[0]) if len(paths) == 1 else merge_handbooks(map(parse_handbook, paths))
 
-    return categories
+
+def load_corpora(spec: str = HANDBOOK_FILES) -> Dict[str, Handbook]:
+    return {corpus: load_corpus(paths) for corpus, paths in corpus_files(spec).items()}
+# ======================================================
+# FAQ QUESTIONS FOR FRONTEND (precomputed views)
+# ======================================================
+def get_faq_questions(corpus: str | None = None) -> List[str]:
+    return get_handbook(corpus).faq_questions
+
+def get_faq_categories(corpus: str | None = None) -> List[Dict]:
+    return get_handbook(corpus).faq_categories
 # ======================================================
 # SINGLE SOURCE OF TRUTH
 # ======================================================
-NESTED_DATA = build_nested_dictionary("data/motor_insurance.txt")
\ No newline at end of file
+# parsed on first use, not at import (importing chunking/ingest never needs it)
+CORPORA: Dict[str, Handbook] | None = None
+# every corpus merged (what untagged requests answer from); api_server may set it from artifacts
+HANDBOOK: Handbook | None = None
+
+
+def get_corpora() -> Dict[str, Handbook]:
+    global CORPORA
+    if CORPORA is None:
+        CORPORA = load_corpora()
+    return CORPORA
+
+
+def get_handbook(corpus: str | None = None) -> Handbook:
+    global HANDBOOK
+    if corpus is not None:
+        return get_corpora()[corpus]
+    if HANDBOOK is None:
+        corpora = get_corpora()
+        HANDBOOK = next(iter(corpora.values())) if len(corpora) == 1 else merge_handbooks(corpora.values())
+    return HANDBOOK
+
+
+def set_handbook(hb: Handbook):
+    global HANDBOOK
+    HANDBOOK = hb
+
+
+def reset_handbooks():
+    """Forget the parsed handbooks; the next use re-reads HANDBOOK_FILES."""
+    global CORPORA, HANDBOOK
+    CORPORA = HANDBOOK = None
+
+
+def get_nested_data() -> Dict[str, Dict[str, str]]:
+    return get_handbook().to_nested()
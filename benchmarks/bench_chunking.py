@@ -0,0 +1,90 @@
+"""
+Per-line ingestion vs structure-aware chunks: recall@k and prompt tokens.
+
+For every handbook FAQ (or every {"question", "answer"} line of --queries),
+both corpora are embedded with the configured model and searched exactly
+(cosine). A query counts as recalled at k when the concatenated top-k
+context covers at least --coverage of the gold answer's words.
+
+    python benchmarks/bench_chunking.py --data data/motor_insurance.txt --k 2 4 8
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from app import build_nested_dictionary  # noqa: E402
+from chunking import chunk_handbook, count_tokens  # noqa: E402
+from embeddings import encode_documents, load_embedder  # noqa: E402
+from faq_index import normalize_rows, top_k_similar  # noqa: E402
+from ingest import load_sentences  # noqa: E402
+
+WORD_RX = re.compile(r"[a-z0-9]+")
+
+
+def words(text: str) -> set:
+    return set(WORD_RX.findall(text.lower()))
+
+
+def load_queries(data_path: Path, queries_path: Path | None):
+    if queries_path:
+        with open(queries_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    return [
+        {"question": q, "answer": a}
+        for qa in build_nested_dictionary(data_path).values()
+        for q, a in qa.items()
+    ]
+
+
+def evaluate(name, texts, model, queries, query_matrix, ks, coverage):
+    matrix = normalize_rows(encode_documents(model, texts))
+    row = {"corpus": name, "points": len(texts)}
+    for k in ks:
+        recalled, tokens = 0, 0
+        for query, qvec in zip(queries, query_matrix):
+            hits = top_k_similar(matrix, qvec, k)
+            context = "\n\n".join(texts[i] for i, _ in hits)
+            tokens += count_tokens(context)
+            gold = words(query["answer"])
+            if gold and len(gold & words(context)) / len(gold) >= coverage:
+                recalled += 1
+        row[f"recall@{k}"] = round(recalled / len(queries), 3)
+        row[f"tokens@{k}"] = round(tokens / len(queries), 1)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", type=Path, default=Path(os.getenv("DATA_FILE", "data/motor_insurance.txt")))
+    parser.add_argument("--queries", type=Path, default=None)
+    parser.add_argument("--k", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--coverage", type=float, default=0.5)
+    parser.add_argument("--max-tokens", type=int, default=200)
+    parser.add_argument("--overlap", type=int, default=40)
+    args = parser.parse_args()
+
+    model = load_embedder(os.getenv("EMBED_MODEL_NAME", "all-MiniLM-L6-v2"))
+    queries = load_queries(args.data, args.queries)
+    query_matrix = normalize_rows(model.encode([q["question"] for q in queries]))
+
+    per_line = load_sentences(args.data)
+    chunks = [c["text"] for c in chunk_handbook(args.data, args.max_tokens, args.overlap)]
+
+    rows = [
+        evaluate("per-line", per_line, model, queries, query_matrix, args.k, args.coverage),
+        evaluate("chunked", chunks, model, queries, query_matrix, args.k, args.coverage),
+    ]
+    print(f"{len(queries)} queries, coverage >= {args.coverage}")
+    for row in rows:
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
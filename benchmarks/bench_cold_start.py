@@ -0,0 +1,104 @@
+"""
+Cold start: process spawn -> first answered request -> /readyz 200.
+
+Starts `uvicorn api_server:app` from --workdir once per mode and run, and
+polls until an exact-FAQ /ask is answered and until /readyz reports ready.
+
+    python benchmarks/bench_cold_start.py --workdir . --runs 5
+
+Modes:
+- eager:     old behaviour — model loaded at import, handbook parsed, FAQs
+             encoded before the app serves (EMBED_PRELOAD=true, no artifacts)
+- lazy:      model loaded in the background after startup, handbook parsed
+- artifacts: lazy model + FAQ data/matrix from ingest.py's FAQ_ARTIFACT_DIR
+
+Retrieval settings (RETRIEVER_BACKEND, QDRANT_*, LOCAL_INDEX_DIR) and
+GROQ_* are taken from the environment; Groq is never called.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+MODES = {
+    "eager": {"EMBED_PRELOAD": "true", "FAQ_ARTIFACT_DIR": ""},
+    "lazy": {"EMBED_PRELOAD": "false", "FAQ_ARTIFACT_DIR": ""},
+    "artifacts": {"EMBED_PRELOAD": "false"},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(url: str, body: dict | None = None) -> int:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=5) as res:
+            return res.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return 0
+
+
+def wait_for(check, started: float, timeout: float) -> float:
+    while time.perf_counter() - started < timeout:
+        if check():
+            return time.perf_counter() - started
+        time.sleep(0.01)
+    raise TimeoutError("server did not come up")
+
+
+def run_once(workdir: Path, mode: str, question: str, timeout: float) -> tuple:
+    port = free_port()
+    env = {**os.environ, "GROQ_API_KEY": os.getenv("GROQ_API_KEY", "bench"), **MODES[mode]}
+    base = f"http://127.0.0.1:{port}"
+
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        first = wait_for(lambda: request(f"{base}/ask", {"question": question}) == 200, started, timeout)
+        ready = wait_for(lambda: request(f"{base}/readyz") == 200, started, timeout)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return first, ready
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workdir", default=str(Path(__file__).resolve().parent.parent))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--question", default="What is the period of the policy?",
+                        help="a handbook question (answered by the exact FAQ tier)")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10} {'first answer (ms)':>18} {'ready (ms)':>12}")
+    for mode in args.modes:
+        runs = [run_once(Path(args.workdir), mode, args.question, args.timeout) for _ in range(args.runs)]
+        first = statistics.median(r[0] for r in runs) * 1000
+        ready = statistics.median(r[1] for r in runs) * 1000
+        print(f"{mode:<10} {first:>18.0f} {ready:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
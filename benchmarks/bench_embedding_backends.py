@@ -0,0 +1,173 @@
+"""
+Embedding backends (torch / onnx / onnx-int8): latency, throughput, RSS and retrieval parity.
+
+Each backend runs in its own process, so RSS is per backend. Queries are
+the handbook FAQ questions and the corpus is the handbook chunks.
+Parity compares every backend with the torch reference, using the same
+exact cosine search the local retriever uses:
+- cosine: agreement between the two vectors of the same query
+- top1: share of queries whose best chunk is unchanged
+- overlap@k: mean share of the reference top-k that is still in the top-k
+
+    python benchmarks/bench_embedding_backends.py --data data/motor_insurance.txt
+    python benchmarks/bench_embedding_backends.py --check --min-overlap 0.9   # exit 1 on drift
+
+EMBED_MODEL_NAME, EMBED_ONNX_DIR and EMBED_ONNX_THREADS are read from the environment.
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from app import build_nested_dictionary  # noqa: E402
+from chunking import chunk_handbook  # noqa: E402
+from faq_index import build_faq_pairs, normalize_rows, top_k_similar_batch  # noqa: E402
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_texts(data: Path):
+    queries = [q for q, _ in build_faq_pairs(build_nested_dictionary(data))]
+    corpus = [c["text"] for c in chunk_handbook(data)]
+    return queries, corpus
+
+
+# =========================
+# CHILD: one backend
+# =========================
+def run_child(backend: str, data: Path, out: Path, repeat: int, batch_size: int):
+    from embeddings import load_embedder
+
+    queries, corpus = load_texts(data)
+    base_rss = rss_mb()
+
+    started = time.perf_counter()
+    model = load_embedder(
+        os.getenv("EMBED_MODEL_NAME", "all-MiniLM-L6-v2"),
+        backend,
+        onnx_dir=os.getenv("EMBED_ONNX_DIR") or None,
+        threads=int(os.getenv("EMBED_ONNX_THREADS", 0)),
+    )
+    load_s = time.perf_counter() - started
+    model.encode(queries[:2])  # first-call setup out of the timings
+
+    # single-query latency: the api_server FAQ-miss path
+    latencies = []
+    for _ in range(repeat):
+        for q in queries:
+            t = time.perf_counter()
+            model.encode([q], batch_size=1)
+            latencies.append(time.perf_counter() - t)
+    latencies.sort()
+
+    # throughput: the ingest path
+    docs = corpus * max(1, 2000 // max(1, len(corpus)))
+    t = time.perf_counter()
+    model.encode(docs, batch_size=batch_size)
+    docs_per_s = len(docs) / (time.perf_counter() - t)
+
+    query_vecs = normalize_rows(model.encode(queries, batch_size=batch_size))
+    corpus_vecs = normalize_rows(model.encode(corpus, batch_size=batch_size))
+    np.savez(out, queries=query_vecs, corpus=corpus_vecs)
+
+    print(json.dumps({
+        "backend": backend,
+        "load_s": round(load_s, 2),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 2),
+        "docs_per_s": round(docs_per_s, 1),
+        "rss_mb": round(rss_mb(), 1),
+        "model_rss_mb": round(rss_mb() - base_rss, 1),
+    }))
+
+
+# =========================
+# PARENT
+# =========================
+def parity(ref: dict, cand: dict, k: int) -> dict:
+    cos = np.sum(ref["queries"] * cand["queries"], axis=1)
+    ref_top = top_k_similar_batch(ref["corpus"], ref["queries"], k)
+    cand_top = top_k_similar_batch(cand["corpus"], cand["queries"], k)
+    top1 = [r[0][0] == c[0][0] for r, c in zip(ref_top, cand_top)]
+    overlap = [
+        len({i for i, _ in r} & {i for i, _ in c}) / len(r)
+        for r, c in zip(ref_top, cand_top)
+    ]
+    return {
+        "cosine_mean": round(float(cos.mean()), 4),
+        "cosine_min": round(float(cos.min()), 4),
+        "top1": round(float(statistics.mean(top1)), 3),
+        f"overlap@{k}": round(float(statistics.mean(overlap)), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default="data/motor_insurance.txt")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--repeat", type=int, default=5, help="passes over the queries for latency")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--check", action="store_true", help="exit 1 if a backend drifts from torch")
+    parser.add_argument("--min-overlap", type=float, default=0.9)
+    parser.add_argument("--child", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, Path(args.data), Path(args.out), args.repeat, args.batch_size)
+        return
+
+    results, vectors = [], {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            out = Path(tmp) / f"{backend}.npz"
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", backend, "--out", str(out), "--data", args.data,
+                 "--repeat", str(args.repeat), "--batch-size", str(args.batch_size)],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"[{backend}] failed:\n{proc.stderr.strip().splitlines()[-1] if proc.stderr else ''}")
+                continue
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+            vectors[backend] = dict(np.load(out))
+
+    print(f"{'backend':<10} {'load s':>7} {'p50 ms':>7} {'p95 ms':>7} {'docs/s':>8} {'RSS MB':>7} {'model MB':>9}")
+    for r in results:
+        print(f"{r['backend']:<10} {r['load_s']:>7} {r['p50_ms']:>7} {r['p95_ms']:>7} "
+              f"{r['docs_per_s']:>8} {r['rss_mb']:>7} {r['model_rss_mb']:>9}")
+
+    if "torch" not in vectors:
+        print("\nparity: torch reference unavailable")
+        sys.exit(1 if args.check else 0)
+
+    failed = False
+    print(f"\nparity vs torch (k={args.k})")
+    for backend, vecs in vectors.items():
+        if backend == "torch":
+            continue
+        stats = parity(vectors["torch"], vecs, args.k)
+        print(f"  {backend:<10} {stats}")
+        failed |= stats[f"overlap@{args.k}"] < args.min_overlap
+    if args.check and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
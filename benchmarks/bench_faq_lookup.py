@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: per-request exact FAQ lookup cost vs corpus size.
+
+Compares the old linear scan (normalize every FAQ question on every call)
+with the precomputed normalized-question index.
+
+    python benchmarks/bench_faq_lookup.py --sizes 40 1000 10000 50000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from faq_index import build_exact_index, normalize  # noqa: E402
+
+WORDS = (
+    "what is the premium policy claim vehicle insurance cover own damage third "
+    "party liability ncb idv renewal transfer rto form driver licence accident "
+    "theft settlement surveyor garage cashless deductible endorsement period"
+).split()
+
+
+def make_corpus(n: int, per_section: int = 25):
+    rng = random.Random(n)
+    data = {}
+    for i in range(n):
+        section = f"Section {i // per_section}"
+        words = rng.choices(WORDS, k=rng.randint(6, 14))
+        question = " ".join(words).capitalize() + f" #{i}?"
+        data.setdefault(section, {})[question] = "Answer text " * 20
+    return data
+
+
+def linear_lookup(nested_data, question):
+    q_norm = normalize(question)
+    for _, qa_map in nested_data.items():
+        for faq_q, faq_a in qa_map.items():
+            if normalize(faq_q) == q_norm:
+                return faq_a
+    return None
+
+
+def indexed_lookup(index, question):
+    hit = index.get(normalize(question))
+    return hit["answer"] if hit else None
+
+
+def time_per_call(fn, queries, min_seconds=0.5):
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for q in queries:
+            fn(q)
+        calls += len(queries)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[40, 1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'faqs':>8} {'build ms':>10} {'linear us/req':>15} {'index us/req':>14} {'speedup':>9}")
+    for n in args.sizes:
+        data = make_corpus(n)
+        all_questions = [q for qa in data.values() for q in qa]
+        rng = random.Random(0)
+        # half hits (worst case: late in the corpus), half misses
+        queries = rng.sample(all_questions, min(len(all_questions), args.queries // 2))
+        queries += [f"unknown question number {i}" for i in range(args.queries // 2)]
+
+        t0 = time.perf_counter()
+        index = build_exact_index(data)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        for q in queries:
+            assert linear_lookup(data, q) == indexed_lookup(index, q)
+
+        linear = time_per_call(lambda q: linear_lookup(data, q), queries)
+        indexed = time_per_call(lambda q: indexed_lookup(index, q), queries)
+        print(
+            f"{n:>8} {build_ms:>10.2f} {linear * 1e6:>15.1f} "
+            f"{indexed * 1e6:>14.2f} {linear / indexed:>8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Load test: blocking requests.post (old /ask path) vs the pooled async aiohttp client.
+
+Starts benchmarks/fake_groq.py locally and fires the same number of chat
+completion calls through both clients.
+
+    python benchmarks/bench_groq_client.py --requests 500 --latency-ms 800
+
+"before" mirrors the old sync route: every call is a fresh requests.post
+(no session, new connection) running on a 40-thread pool, which is the
+size of Starlette's default threadpool that sync routes run on.
+"after" is one aiohttp.ClientSession with keep-alive, gated at --concurrency
+in-flight calls on a single event loop (the api_server setup).
+"""
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import aiohttp
+import requests
+
+HERE = Path(__file__).resolve().parent
+PAYLOAD = {
+    "model": "llama-3.3-70b-versatile",
+    "messages": [
+        {"role": "system", "content": "You are a motor insurance advisor."},
+        {"role": "user", "content": "Context:\n...\n\nQuestion:\nWhat is IDV?"},
+    ],
+    "temperature": 0.2,
+    "max_tokens": 256,
+}
+
+
+def start_fake_groq(port: int, latency_ms: float) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, str(HERE / "fake_groq.py"), "--port", str(port), "--latency-ms", str(latency_ms)]
+    )
+    url = f"http://127.0.0.1:{port}/docs"
+    for _ in range(100):
+        try:
+            requests.get(url, timeout=0.2)
+            return proc
+        except requests.RequestException:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("fake Groq server did not start")
+
+
+def summarize(name: str, latencies, wall: float):
+    latencies = sorted(latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(
+        f"{name:<8} {len(latencies) / wall:>10.1f} req/s   "
+        f"p50 {statistics.median(latencies) * 1000:>7.0f} ms   p95 {p95 * 1000:>7.0f} ms   "
+        f"wall {wall:>6.2f} s"
+    )
+    return len(latencies) / wall
+
+
+def run_blocking(base_url: str, n: int, threads: int) -> float:
+    def one(_):
+        t0 = time.perf_counter()
+        res = requests.post(f"{base_url}/openai/v1/chat/completions", json=PAYLOAD, timeout=30)
+        res.raise_for_status()
+        res.json()["choices"][0]["message"]["content"]
+        return time.perf_counter() - t0
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one, range(n)))
+    return summarize("before", latencies, time.perf_counter() - start)
+
+
+async def run_async(base_url: str, n: int, concurrency: int) -> float:
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=30)
+    gate = asyncio.Semaphore(concurrency)
+
+    async with aiohttp.ClientSession(
+        base_url, connector=connector, timeout=timeout, raise_for_status=True
+    ) as client:
+        async def one():
+            async with gate:
+                t0 = time.perf_counter()
+                async with client.post("/openai/v1/chat/completions", json=PAYLOAD) as res:
+                    (await res.json())["choices"][0]["message"]["content"]
+                return time.perf_counter() - t0
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(one() for _ in range(n)))
+    return summarize("after", latencies, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Groq client load test against a local stub")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--threads", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args()
+
+    proc = start_fake_groq(args.port, args.latency_ms)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        before = run_blocking(base_url, args.requests, args.threads)
+        after = asyncio.run(run_async(base_url, args.requests, args.concurrency))
+        print(f"throughput x{after / before:.1f}")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""
+Load test of the whole API against local stand-ins, with JSON results for regression tracking.
+
+Per run it:
+1. ingests the handbook with ingest.py into a temp Qdrant local-mode
+   collection (QDRANT_PATH), or a NumPy index with --retriever numpy,
+   plus FAQ artifacts;
+2. starts benchmarks/fake_groq.py (latency, token rate, errors configurable);
+3. starts `uvicorn api_server:app` on those and waits for /readyz;
+4. replays question mixes — one phase per kind, then the mix:
+   - exact:      handbook FAQ questions verbatim        (faq-exact tier)
+   - paraphrase: reworded FAQ questions                 (faq-semantic tier)
+   - novel:      --questions JSONL (requests.jsonl shape, read like
+                 bulk_answer.py) or generated questions (RAG tier; repeats
+                 come back from the answer cache)
+5. reports p50/p95/p99 latency and server RSS per answer tier (faq-exact,
+   faq-semantic, qdrant+groq, cached, fallback, error), throughput and
+   server RSS per phase, and writes it all to --out. A tier's RSS is read
+   from /proc as each of its responses arrives (median and max); in the
+   single-kind phases that is the footprint of serving that tier.
+
+--stub-embedder swaps the embedding model for a hashing bag-of-words
+stand-in (no model download or inference), which isolates the serving path;
+the faq-semantic hit rate is not representative with it.
+
+    python benchmarks/bench_load.py --requests 300 --concurrency 32
+    python benchmarks/bench_load.py --stub-embedder --requests 200
+    python benchmarks/bench_load.py --out new.json --compare benchmarks/results/base.json --check
+
+--compare prints p95/throughput deltas per phase and tier; --check exits 1
+if any exceeds --max-regression.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import aiohttp
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app import parse_handbook  # noqa: E402
+from bulk_answer import read_items  # noqa: E402
+
+KINDS = ("exact", "paraphrase", "novel")
+FALLBACK_PREFIX = "Based on the available information"
+
+# paraphrase: swap in synonyms and wrap the question, so the exact tier misses
+SYNONYMS = {
+    "vehicle": "car", "car": "vehicle", "policy": "insurance cover", "premium": "price",
+    "claim": "claim request", "insurer": "insurance company", "buy": "purchase",
+    "get": "obtain", "what": "which", "how": "in what way", "can": "could",
+}
+WRAPPERS = ("{q}", "please tell me {q}", "{q} - could you explain", "i want to know {q}")
+
+# novel: handbook-flavoured questions the FAQ does not contain
+SUBJECTS = ("my scooter", "a leased truck", "an electric car", "a vintage bike", "a taxi", "a tractor")
+EVENTS = ("a flood", "a riot", "a hit-and-run", "engine seizure", "a tyre burst", "a landslide")
+ASKS = (
+    "Is {s} covered after {e}?",
+    "What documents do I need to claim for {s} damaged in {e}?",
+    "Does the deductible change for {s} after {e}?",
+    "How long does settlement take for {s} after {e}?",
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_mb(pid: int) -> Dict[str, float | None]:
+    """Current and peak RSS of a process (Linux /proc; None elsewhere)."""
+    out = {"rss_mb": None, "peak_rss_mb": None}
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return out
+    for key, field in (("VmRSS", "rss_mb"), ("VmHWM", "peak_rss_mb")):
+        match = re.search(rf"^{key}:\s+(\d+) kB", status, re.M)
+        if match:
+            out[field] = round(int(match.group(1)) / 1024, 1)
+    return out
+
+
+# --stub-embedder: imported instead of the real sentence_transformers (PYTHONPATH)
+STUB_EMBEDDER = '''"""bench_load --stub-embedder: words hashed into a 384-d bag-of-words vector."""
+import hashlib
+import re
+
+import numpy as np
+
+DIM = 384
+
+
+class SentenceTransformer:
+    def __init__(self, name, **kwargs):
+        self.name = name
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+    def _one(self, text):
+        v = np.zeros(DIM, dtype=np.float32)
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            v[int(hashlib.md5(word.encode()).hexdigest(), 16) % DIM] += 1
+        return v
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        if isinstance(texts, str):
+            return self._one(texts)
+        return np.stack([self._one(t) for t in texts]) if len(texts) else np.zeros((0, DIM), dtype=np.float32)
+'''
+
+
+def stub_embedder_env(work: Path) -> Dict[str, str]:
+    stub_dir = work / "stub_embedder"
+    stub_dir.mkdir(exist_ok=True)
+    (stub_dir / "sentence_transformers.py").write_text(STUB_EMBEDDER, encoding="utf-8")
+    path = os.pathsep.join(p for p in (str(stub_dir), os.environ.get("PYTHONPATH", "")) if p)
+    return {"PYTHONPATH": path, "EMBED_BACKEND": "torch", "EMBED_MODEL_NAME": "stub-hash-384"}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+# =========================
+# WORKLOAD
+# =========================
+def paraphrase(question: str, rng: random.Random) -> str:
+    words = [SYNONYMS.get(w.lower(), w) if rng.random() < 0.5 else w for w in question.rstrip("?").split()]
+    return rng.choice(WRAPPERS).format(q=" ".join(words)) + "?"
+
+
+def novel_questions(path: str | None, rng: random.Random, n: int) -> List[str]:
+    if path:
+        return [item["question"] for item in read_items(path)]
+    return [rng.choice(ASKS).format(s=rng.choice(SUBJECTS), e=rng.choice(EVENTS)) for _ in range(n)]
+
+
+def build_workload(faq: List[str], novel: List[str], mix: Dict[str, float], n: int,
+                   rng: random.Random) -> List[tuple]:
+    kinds = [k for k in KINDS if mix.get(k, 0) > 0]
+    picks = rng.choices(kinds, weights=[mix[k] for k in kinds], k=n)
+    workload = []
+    for kind in picks:
+        if kind == "exact":
+            workload.append((kind, rng.choice(faq)))
+        elif kind == "paraphrase":
+            workload.append((kind, paraphrase(rng.choice(faq), rng)))
+        else:
+            workload.append((kind, rng.choice(novel)))
+    return workload
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in KINDS:
+            raise argparse.ArgumentTypeError(f"unknown question kind {kind!r} (use {', '.join(KINDS)})")
+        mix[kind.strip()] = float(weight or 1)
+    return mix
+
+
+# =========================
+# STAND-INS
+# =========================
+def ingest(work: Path, handbook: Path, retriever: str, env: Dict[str, str]):
+    backend = "local" if retriever == "numpy" else "qdrant"
+    run_env = {**env, "INGEST_BACKEND": backend}
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "ingest.py"], cwd=ROOT, env=run_env, check=True,
+                   stdout=subprocess.DEVNULL)
+    print(f"[bench] ingested {handbook} ({backend}) in {time.perf_counter() - started:.1f}s")
+
+
+def start(cmd: List[str], env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def wait_ready(url: str, timeout: float):
+    deadline = time.perf_counter() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.perf_counter() < deadline:
+            try:
+                async with session.get(url) as res:
+                    if res.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.1)
+    raise TimeoutError(f"{url} not ready after {timeout:.0f}s")
+
+
+# =========================
+# RUN
+# =========================
+def tier_of(status: int, body: Dict) -> str:
+    if status != 200:
+        return "error"
+    if str(body.get("answer", "")).lstrip('"').startswith(FALLBACK_PREFIX):
+        return "fallback"
+    return "cached" if body.get("cached") else body.get("source", "unknown")
+
+
+async def run_phase(base: str, workload: List[tuple], concurrency: int, server_pid: int) -> Dict:
+    gate = asyncio.Semaphore(concurrency)
+    samples: List[tuple] = []
+    timeout = aiohttp.ClientTimeout(total=120)
+
+    async with aiohttp.ClientSession(base, timeout=timeout) as session:
+        async def one(question: str):
+            async with gate:
+                t = time.perf_counter()
+                try:
+                    async with session.post("/ask", json={"question": question}) as res:
+                        status, body = res.status, await res.json(content_type=None)
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                    status, body = 0, {}
+                elapsed = time.perf_counter() - t
+                samples.append((tier_of(status, body), elapsed, rss_mb(server_pid)["rss_mb"]))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(q) for _, q in workload))
+        wall = time.perf_counter() - started
+
+    tiers = {}
+    for tier in sorted({t for t, _, _ in samples}):
+        latencies = sorted(s for t, s, _ in samples if t == tier)
+        rss = sorted(m for t, _, m in samples if t == tier and m is not None)
+        tiers[tier] = {
+            "count": len(latencies),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+            "rss_mb": percentile(rss, 0.50) if rss else None,
+            "max_rss_mb": rss[-1] if rss else None,
+        }
+    all_latencies = sorted(s for _, s, _ in samples)
+    return {
+        "requests": len(samples),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(samples) / wall, 1),
+        "p50_ms": round(percentile(all_latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(all_latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(all_latencies, 0.99) * 1000, 2),
+        "tiers": tiers,
+        **rss_mb(server_pid),
+    }
+
+
+def print_phase(name: str, phase: Dict):
+    print(f"\n{name}: {phase['requests']} req, {phase['throughput_rps']} req/s, "
+          f"RSS {phase['rss_mb']} MB (peak {phase['peak_rss_mb']} MB)")
+    print(f"  {'tier':<14} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'RSS MB':>8} {'max MB':>8}")
+    for tier, t in phase["tiers"].items():
+        print(f"  {tier:<14} {t['count']:>5} {t['p50_ms']:>9} {t['p95_ms']:>9} {t['p99_ms']:>9}"
+              f" {t['rss_mb']!s:>8} {t['max_rss_mb']!s:>8}")
+
+
+def compare(result: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """Human-readable deltas; returns the regressions over max_regression."""
+    regressions = []
+    print(f"\nvs {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    for name, phase in result["phases"].items():
+        base = baseline["phases"].get(name)
+        if not base:
+            continue
+        rows = [("throughput_rps", phase["throughput_rps"], base["throughput_rps"], True)]
+        rows += [
+            (f"{tier} p95_ms", t["p95_ms"], base["tiers"][tier]["p95_ms"], False)
+            for tier, t in phase["tiers"].items() if tier in base["tiers"]
+        ]
+        for label, new, old, higher_is_better in rows:
+            if not old:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = "  REGRESSION" if worse > max_regression else ""
+            print(f"  {name:<11} {label:<22} {old:>9} -> {new:>9} ({change:+.0%}){flag}")
+            if flag:
+                regressions.append(f"{name} {label}")
+    return regressions
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def bench(args, work: Path) -> Dict:
+    rng = random.Random(args.seed)
+    handbook = Path(args.handbook).resolve()
+    faq = parse_handbook(handbook).faq_questions
+    novel = novel_questions(args.questions, rng, max(50, args.requests))
+
+    env = {
+        **os.environ,
+        "QDRANT_PATH": str(work / "qdrant") if args.retriever == "qdrant" else "",
+        "RETRIEVER_BACKEND": args.retriever,
+        "LOCAL_INDEX_DIR": str(work / "index"),
+        "FAQ_ARTIFACT_DIR": str(work / "faq"),
+        "INGEST_MANIFEST": str(work / "ingest_manifest.json"),
+        "EMBED_DOC_CACHE": str(work / "embed_cache.sqlite"),
+        "CORPUS_VERSION_FILE": str(work / "corpus_version"),
+        "HANDBOOK_FILE": str(handbook),
+        "HANDBOOK_FILES": str(handbook),
+        "ANSWER_CACHE_DB": "",
+        **(stub_embedder_env(work) if args.stub_embedder else {}),
+    }
+    ingest(work, handbook, args.retriever, env)
+
+    groq_port, api_port = free_port(), free_port()
+    groq = start([sys.executable, "benchmarks/fake_groq.py", "--port", str(groq_port),
+                  "--latency-ms", str(args.groq_latency_ms), "--tokens-per-s", str(args.groq_tokens_per_s),
+                  "--answer-tokens", str(args.answer_tokens), "--error-rate", str(args.groq_error_rate)], env)
+    api_env = {**env, "GROQ_API_KEY": "bench", "GROQ_BASE_URL": f"http://127.0.0.1:{groq_port}"}
+    api = start([sys.executable, "-m", "uvicorn", "api_server:app", "--port", str(api_port),
+                 "--log-level", "warning"], api_env)
+    base = f"http://127.0.0.1:{api_port}"
+    try:
+        await wait_ready(f"http://127.0.0.1:{groq_port}/_faults", 30)
+        await wait_ready(f"{base}/readyz", args.ready_timeout)
+        result = {"idle": rss_mb(api.pid), "phases": {}}
+
+        phases = [(k, {k: 1.0}) for k in KINDS if args.mix.get(k, 0) > 0] + [("mix", args.mix)]
+        for name, mix in phases:
+            workload = build_workload(faq, novel, mix, args.requests, rng)
+            result["phases"][name] = phase = await run_phase(base, workload, args.concurrency, api.pid)
+            print_phase(name, phase)
+        return result
+    finally:
+        for proc in (api, groq):
+            proc.terminate()
+            proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--handbook", default=os.getenv("HANDBOOK_FILE", "data/motor_insurance.txt"))
+    parser.add_argument("--questions", help="JSONL of novel questions (requests.jsonl shape)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("exact=0.4,paraphrase=0.3,novel=0.3"))
+    parser.add_argument("--requests", type=int, default=300, help="requests per phase")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--retriever", choices=("qdrant", "numpy"), default="qdrant",
+                        help="qdrant = local-mode collection (no server)")
+    parser.add_argument("--groq-latency-ms", type=float, default=300, help="fake Groq time to first token")
+    parser.add_argument("--groq-tokens-per-s", type=float, default=250)
+    parser.add_argument("--answer-tokens", type=int, default=120)
+    parser.add_argument("--groq-error-rate", type=float, default=0.0)
+    parser.add_argument("--stub-embedder", action="store_true",
+                        help="hashing stand-in instead of the embedding model (serving path only)")
+    parser.add_argument("--ready-timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default=None, help="results JSON (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="baseline results JSON")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    parser.add_argument("--check", action="store_true", help="exit 1 on a regression vs --compare")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_load_") as tmp:
+        result = asyncio.run(bench(args, Path(tmp)))
+
+    commit = git_commit()
+    result["meta"] = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "embed_model": "stub-hash-384" if args.stub_embedder else os.getenv("EMBED_MODEL_NAME", "all-MiniLM-L6-v2"),
+        "embed_backend": "stub" if args.stub_embedder else os.getenv("EMBED_BACKEND", "torch"),
+        "args": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "check")},
+    }
+    out = Path(args.out or ROOT / "benchmarks" / "results" / f"{commit or 'run'}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"\n[bench] results written to {out}")
+
+    if args.compare:
+        regressions = compare(result, json.loads(Path(args.compare).read_text(encoding="utf-8")),
+                              args.max_regression)
+        if args.check and regressions:
+            print(f"[bench] {len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Local stand-in for Groq's OpenAI-compatible chat completions endpoint.
+
+    python benchmarks/fake_groq.py --port 9000 --latency-ms 800
+    python benchmarks/fake_groq.py --latency-ms 300 --tokens-per-s 250 --answer-tokens 150
+    python benchmarks/fake_groq.py --error-rate 0.2 --error-status 429 --retry-after 1 --slow-rate 0.05 --slow-ms 5000
+
+Point the API at it with GROQ_BASE_URL=http://127.0.0.1:9000 and any GROQ_API_KEY.
+
+Faults (for the LLM client's retry / hedging / breaker) can also be changed
+while running: POST /_faults with any of the FAULTS keys, GET /_faults for
+them plus request counts.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import random
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_MS = float(os.getenv("FAKE_GROQ_LATENCY_MS", 800))
+# stream=true: LATENCY_MS is the time to first token, then one word per TOKEN_MS
+TOKEN_MS = float(os.getenv("FAKE_GROQ_TOKEN_MS", 20))
+ANSWER = os.getenv(
+    "FAKE_GROQ_ANSWER",
+    "Third Party Liability insurance is mandatory for all vehicles plying on public roads.",
+)
+# > 0: generation speed; overrides TOKEN_MS and adds answer_tokens / rate to non-stream calls
+TOKENS_PER_S = float(os.getenv("FAKE_GROQ_TOKENS_PER_S", 0))
+# > 0: answers are this many words (ANSWER repeated), for realistic generation time
+ANSWER_TOKENS = int(os.getenv("FAKE_GROQ_ANSWER_TOKENS", 0))
+if TOKENS_PER_S > 0:
+    TOKEN_MS = 1000 / TOKENS_PER_S
+
+FAULTS = {
+    # share of requests answered with error_status (Retry-After: retry_after s, if > 0)
+    "error_rate": float(os.getenv("FAKE_GROQ_ERROR_RATE", 0)),
+    "error_status": int(os.getenv("FAKE_GROQ_ERROR_STATUS", 503)),
+    "retry_after": float(os.getenv("FAKE_GROQ_RETRY_AFTER", 0)),
+    # share of requests that take slow_ms instead of LATENCY_MS (tail latency)
+    "slow_rate": float(os.getenv("FAKE_GROQ_SLOW_RATE", 0)),
+    "slow_ms": float(os.getenv("FAKE_GROQ_SLOW_MS", 5000)),
+}
+COUNTS = {"requests": 0, "errors": 0, "slow": 0}
+
+app = FastAPI()
+
+
+def injected_error() -> JSONResponse | None:
+    if random.random() >= FAULTS["error_rate"]:
+        return None
+    COUNTS["errors"] += 1
+    headers = {"Retry-After": f"{FAULTS['retry_after']:g}"} if FAULTS["retry_after"] > 0 else None
+    body = {"error": {"message": "injected fault", "type": "fake_groq"}}
+    return JSONResponse(body, status_code=FAULTS["error_status"], headers=headers)
+
+
+def latency_s() -> float:
+    if random.random() < FAULTS["slow_rate"]:
+        COUNTS["slow"] += 1
+        return FAULTS["slow_ms"] / 1000
+    return LATENCY_MS / 1000
+
+
+def answer_text() -> str:
+    if ANSWER_TOKENS <= 0:
+        return ANSWER
+    words = ANSWER.split()
+    return " ".join(words[i % len(words)] for i in range(ANSWER_TOKENS))
+
+
+def generation_s(content: str) -> float:
+    return len(content.split()) / TOKENS_PER_S if TOKENS_PER_S > 0 else 0.0
+
+
+def completion_body(model: str, content: str, prompt_tokens: int) -> dict:
+    completion_tokens = len(content.split())
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+async def stream_chunks(model: str, content: str, prompt_tokens: int, latency: float):
+    chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+    await asyncio.sleep(latency)
+    for i, word in enumerate(content.split(" ")):
+        delta = {"content": word if i == 0 else " " + word}
+        chunk = {
+            "id": chunk_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+        await asyncio.sleep(TOKEN_MS / 1000)
+
+    # like Groq: usage rides on the final chunk under x_groq
+    completion_tokens = len(content.split())
+    final = {
+        "id": chunk_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        "x_groq": {
+            "id": chunk_id,
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        },
+    }
+    yield f"data: {json.dumps(final)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    COUNTS["requests"] += 1
+    body = await request.json()
+    model = body.get("model", "fake")
+    prompt_tokens = sum(len(m.get("content", "").split()) for m in body.get("messages", []))
+    latency = latency_s()
+    error = injected_error()
+    if error is not None:
+        # errors come back after a (shortened) round trip, like a real overloaded upstream
+        await asyncio.sleep(min(latency, LATENCY_MS / 1000) / 4)
+        return error
+    content = answer_text()
+    if body.get("stream"):
+        return StreamingResponse(
+            stream_chunks(model, content, prompt_tokens, latency), media_type="text/event-stream"
+        )
+
+    await asyncio.sleep(latency + generation_s(content))
+    return completion_body(model, content, prompt_tokens)
+
+
+@app.get("/_faults")
+async def get_faults():
+    return {**FAULTS, **COUNTS}
+
+
+@app.post("/_faults")
+async def set_faults(request: Request):
+    for key, value in (await request.json()).items():
+        if key in FAULTS:
+            FAULTS[key] = type(FAULTS[key])(value)
+    return FAULTS
+
+
+def main():
+    global LATENCY_MS, TOKEN_MS, TOKENS_PER_S, ANSWER_TOKENS
+    parser = argparse.ArgumentParser(description="Fake Groq chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=LATENCY_MS)
+    parser.add_argument("--token-ms", type=float, default=TOKEN_MS)
+    parser.add_argument("--tokens-per-s", type=float, default=TOKENS_PER_S)
+    parser.add_argument("--answer-tokens", type=int, default=ANSWER_TOKENS)
+    parser.add_argument("--error-rate", type=float, default=FAULTS["error_rate"])
+    parser.add_argument("--error-status", type=int, default=FAULTS["error_status"])
+    parser.add_argument("--retry-after", type=float, default=FAULTS["retry_after"])
+    parser.add_argument("--slow-rate", type=float, default=FAULTS["slow_rate"])
+    parser.add_argument("--slow-ms", type=float, default=FAULTS["slow_ms"])
+    args = parser.parse_args()
+    LATENCY_MS = args.latency_ms
+    TOKEN_MS = 1000 / args.tokens_per_s if args.tokens_per_s > 0 else args.token_ms
+    TOKENS_PER_S = args.tokens_per_s
+    ANSWER_TOKENS = args.answer_tokens
+    for key in FAULTS:
+        FAULTS[key] = getattr(args, key)
+
+    import uvicorn
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
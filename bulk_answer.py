@@ -0,0 +1,116 @@
+"""
+Answer a JSONL file of questions in bulk; writes one JSON result per line.
+
+    python bulk_answer.py questions.jsonl -o answers.jsonl
+    python bulk_answer.py questions.jsonl --api http://localhost:8000
+    python bulk_answer.py questions.jsonl --tenant acme --product motor
+
+Input lines are objects with an id ("id" or "request_id") and a question
+("question", else "body", else "title") — the requests.jsonl shape works.
+Without --api the pipeline runs in-process (needs GROQ_API_KEY and the
+retrieval backend configured like api_server.py).
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from typing import Dict, Iterator, List
+
+
+def read_items(path: str) -> Iterator[Dict[str, str]]:
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for n, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            question = record.get("question") or record.get("body") or record.get("title")
+            if not question:
+                print(f"[bulk] line {n}: no question field — skipped", file=sys.stderr)
+                continue
+            item_id = record.get("id") or record.get("request_id") or str(n)
+            yield {"id": str(item_id), "question": question}
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def batched(items: Iterator[Dict[str, str]], size: int) -> Iterator[List[Dict[str, str]]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def answer_in_process(batches, concurrency: int, tenant: str | None, product: str | None):
+    import api_server
+
+    corpus = api_server.request_corpus(tenant, product)
+    async with api_server.lifespan(api_server.app):
+        for batch in batches:
+            items = [api_server.BatchItem(**item) for item in batch]
+            async for result in api_server.answer_batch(items, concurrency, corpus):
+                yield result
+
+
+async def answer_via_api(batches, api: str, concurrency: int, tenant: str | None, product: str | None):
+    import aiohttp
+
+    timeout = aiohttp.ClientTimeout(total=None, sock_read=300)
+    async with aiohttp.ClientSession(timeout=timeout, raise_for_status=True) as session:
+        for batch in batches:
+            body = {"items": batch, "concurrency": concurrency, "tenant": tenant, "product": product}
+            async with session.post(f"{api.rstrip('/')}/ask/batch", json=body) as res:
+                async for line in res.content:
+                    if line.strip():
+                        yield json.loads(line)
+
+
+async def run(args) -> Counter:
+    batches = batched(read_items(args.input), args.batch_size)
+    if args.api:
+        results = answer_via_api(batches, args.api, args.concurrency, args.tenant, args.product)
+    else:
+        results = answer_in_process(batches, args.concurrency, args.tenant, args.product)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    sources = Counter()
+    try:
+        async for result in results:
+            sources[result.get("source") or "error"] += 1
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="JSONL file of questions, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL results file (default stdout)")
+    parser.add_argument("--api", help="base URL of a running api_server (default: in-process)")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent Groq calls per batch")
+    parser.add_argument("--tenant", help="answer from this tenant's corpus")
+    parser.add_argument("--product", help="answer from this product's corpus")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    sources = asyncio.run(run(args))
+    total = sum(sources.values())
+    elapsed = time.perf_counter() - started
+    summary = ", ".join(f"{k}={v}" for k, v in sources.most_common())
+    print(f"[bulk] {total} answers in {elapsed:.1f}s ({summary})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from app import PAGE_SEPARATOR_RX, SECTION_RX, SENTENCE_END, build_nested_dictionary
+
+# =========================
+# TOKENS
+# =========================
+# BPE-ish approximation: words, numbers and single punctuation marks
+_TOKEN_RX = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    return len(_TOKEN_RX.findall(text))
+
+
+# =========================
+# CHUNKS
+# =========================
+def window_lines(lines: List[str], max_tokens: int, overlap_tokens: int) -> Iterator[List[str]]:
+    """
+    Group whole lines into windows of at most `max_tokens` (a single longer
+    line is its own window). Consecutive windows share up to `overlap_tokens`
+    of trailing lines.
+    """
+    window, size = [], 0
+    for line in lines:
+        n = count_tokens(line)
+        if window and size + n > max_tokens:
+            yield window
+            tail, tail_size = [], 0
+            for prev in reversed(window):
+                m = count_tokens(prev)
+                if tail_size + m > overlap_tokens:
+                    break
+                tail.insert(0, prev)
+                tail_size += m
+            window, size = tail, tail_size
+        window.append(line)
+        size += n
+    if window:
+        yield window
+
+
+def iter_section_prose(path: Path) -> Iterator[tuple]:
+    """
+    (section, lines) for the free text of each section: everything outside
+    its Q&A blocks, i.e. before the first "Q." line and after a page break
+    that closes the last answer (same rule as app.parse_lines). Q&A blocks
+    come from build_nested_dictionary.
+    """
+    section, lines, in_qa, in_answer, last = "General", [], False, False, ""
+    with open(path, "r", encoding="utf-8") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line:
+                continue
+            if PAGE_SEPARATOR_RX.fullmatch(line):
+                if in_answer and last.endswith(SENTENCE_END):
+                    in_qa = in_answer = False
+                continue
+            last = line
+
+            section_match = SECTION_RX.match(line)
+            if section_match:
+                if lines:
+                    yield section, lines
+                section, lines, in_qa, in_answer = section_match.group(1), [], False, False
+                continue
+
+            if line.startswith("Q."):
+                in_qa, in_answer = True, False
+            elif line.startswith("Ans."):
+                in_answer = in_qa
+            if not in_qa:
+                lines.append(line)
+    if lines:
+        yield section, lines
+
+
+def chunk_handbook(path: Path, max_tokens: int = 200, overlap_tokens: int = 40,
+                   min_tokens: int = 8) -> List[Dict[str, str]]:
+    """
+    Structure-aware chunks for one handbook:
+    - kind="qa": one chunk per Q&A pair (long answers split, question repeated)
+    - kind="section": token-bounded windows of section prose with overlap
+    Each chunk is a payload dict with text/section/question/kind.
+    """
+    chunks = []
+    source = str(path)
+
+    for section, qa_map in build_nested_dictionary(path).items():
+        for question, answer in qa_map.items():
+            header = f"Q. {question}"
+            budget = max(max_tokens - count_tokens(header), overlap_tokens + 1)
+            for part in window_lines(answer.split(". "), budget, overlap_tokens):
+                chunks.append({
+                    "text": f"{header}\nAns. {'. '.join(part)}",
+                    "section": section,
+                    "question": question,
+                    "kind": "qa",
+                    "source": source,
+                })
+
+    for section, lines in iter_section_prose(path):
+        for part in window_lines(lines, max_tokens, overlap_tokens):
+            body = "\n".join(part)
+            if count_tokens(body) < min_tokens:
+                continue
+            chunks.append({
+                "text": f"{section}\n{body}",
+                "section": section,
+                "question": "",
+                "kind": "section",
+                "source": source,
+            })
+
+    return chunks
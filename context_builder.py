@@ -0,0 +1,59 @@
+import re
+from typing import List, NamedTuple
+
+from chunking import count_tokens
+from retrievers import Hit
+
+_SPACE_RX = re.compile(r"\s+")
+_SENTENCE_RX = re.compile(r"(?<=[.?!])\s+")
+
+
+class AssembledContext(NamedTuple):
+    text: str
+    hits: List[Hit]
+    tokens: int
+    dropped: int
+
+
+def _key(sentence: str) -> str:
+    return _SPACE_RX.sub(" ", sentence.strip().lower())
+
+
+def assemble_context(hits: List[Hit], budget: int, min_novel: float = 0.3) -> AssembledContext:
+    """
+    Best-first context within a token budget.
+
+    - hits are taken in descending score order
+    - sentences already in the context (overlapping windows, repeated Q&A
+      headers, duplicate chunks) are removed from later hits
+    - a hit left with less than `min_novel` of its original tokens is dropped
+    - a hit that no longer fits the remaining budget is skipped
+    """
+    seen = set()
+    parts, used = [], []
+    tokens, dropped = 0, 0
+
+    for hit in sorted(hits, key=lambda h: h.score, reverse=True):
+        novel, keys = [], []
+        for line in hit.text.splitlines():
+            kept = []
+            for sentence in _SENTENCE_RX.split(line.strip()):
+                key = _key(sentence)
+                if key and key not in seen and key not in keys:
+                    kept.append(sentence)
+                    keys.append(key)
+            if kept:
+                novel.append(" ".join(kept))
+
+        text = "\n".join(novel)
+        size = count_tokens(text)
+        if not novel or size < min_novel * count_tokens(hit.text) or tokens + size > budget:
+            dropped += 1
+            continue
+
+        seen.update(keys)
+        parts.append(text)
+        used.append(hit)
+        tokens += size
+
+    return AssembledContext("\n\n".join(parts), used, tokens, dropped)
@@ -0,0 +1,40 @@
+import os
+import time
+from pathlib import Path
+
+# Written by ingest.py after every successful ingestion, read by api_server.py
+CORPUS_VERSION_FILE = Path(os.getenv("CORPUS_VERSION_FILE", "data/.corpus_version"))
+
+
+def write_corpus_version(content_digest: str, path: Path = CORPUS_VERSION_FILE) -> str:
+    """Stamp a new corpus version; anything cached against the old one is stale."""
+    version = f"{int(time.time())}-{content_digest[:12]}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(version, encoding="utf-8")
+    tmp.replace(path)
+    return version
+
+
+class CorpusVersionWatcher:
+    """
+    Current corpus version, re-read only when the version file's mtime changes.
+    Missing file -> "0" (never ingested through a versioned ingest.py).
+    """
+
+    def __init__(self, path: Path = CORPUS_VERSION_FILE):
+        self.path = path
+        self._mtime = None
+        self._version = "0"
+
+    def current(self) -> str:
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._mtime, self._version = None, "0"
+            return self._version
+
+        if mtime != self._mtime:
+            self._mtime = mtime
+            self._version = self.path.read_text(encoding="utf-8").strip() or "0"
+        return self._version
@@ -0,0 +1,385 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from faq_index import normalize, normalize_rows
+
+# =========================
+# MODEL
+# =========================
+# torch: SentenceTransformer | onnx: onnxruntime fp32 | onnx-int8: dynamically quantized
+EMBED_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+_MODELS: Dict[Tuple[str, str], object] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def load_embedder(model_name: str, backend: str = "torch", onnx_dir: str | None = None, threads: int = 0):
+    """One model per (name, backend) per process (api_server and ingest)."""
+    backend = (backend or "torch").lower()
+    if backend not in EMBED_BACKENDS:
+        raise ValueError(f"Unknown EMBED_BACKEND: {backend!r}")
+
+    with _MODELS_LOCK:
+        key = (model_name, backend)
+        if key not in _MODELS:
+            if backend == "torch":
+                from sentence_transformers import SentenceTransformer
+
+                _MODELS[key] = SentenceTransformer(model_name)
+            else:
+                _MODELS[key] = OnnxEmbedder(model_name, quantized=backend == "onnx-int8",
+                                            onnx_dir=onnx_dir, threads=threads)
+        return _MODELS[key]
+
+
+def cache_model_id(model_name: str, backend: str) -> str:
+    """DocEmbeddingCache namespace: int8/ONNX vectors are cached apart from torch ones."""
+    backend = (backend or "torch").lower()
+    return model_name if backend == "torch" else f"{model_name}#{backend}"
+
+
+# =========================
+# ONNX RUNTIME (no torch)
+# =========================
+def _onnx_files(model_name: str, onnx_dir: str | None) -> Tuple[Path, Path]:
+    """
+    (model.onnx, tokenizer.json): from `onnx_dir` (e.g. an
+    `optimum-cli export onnx` output), else the ONNX export published in
+    the model's Hugging Face repo.
+    """
+    if onnx_dir:
+        model_path, tokenizer_path = Path(onnx_dir) / "model.onnx", Path(onnx_dir) / "tokenizer.json"
+        for path in (model_path, tokenizer_path):
+            if not path.exists():
+                raise FileNotFoundError(f"{path} not found (EMBED_ONNX_DIR)")
+        return model_path, tokenizer_path
+
+    from huggingface_hub import hf_hub_download
+
+    repo = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    return Path(hf_hub_download(repo, "onnx/model.onnx")), Path(hf_hub_download(repo, "tokenizer.json"))
+
+
+def _quantize_int8(model_path: Path) -> Path:
+    """Dynamic int8 weight quantization, done once and stored next to the fp32 model."""
+    target = model_path.with_name("model_int8.onnx")
+    if not target.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        quantize_dynamic(str(model_path), str(tmp), weight_type=QuantType.QInt8)
+        os.replace(tmp, target)
+    return target
+
+
+class OnnxEmbedder:
+    """
+    The SentenceTransformer calls we use (encode,
+    get_sentence_embedding_dimension) on onnxruntime + tokenizers:
+    mean pooling over the last hidden state, then L2 normalization.
+    """
+
+    def __init__(self, model_name: str, quantized: bool = False, onnx_dir: str | None = None,
+                 threads: int = 0, max_seq_length: int = 256):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path, tokenizer_path = _onnx_files(model_name, onnx_dir)
+        if quantized:
+            model_path = _quantize_int8(model_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+
+        dim = self.session.get_outputs()[0].shape[-1]
+        self._dim = dim if isinstance(dim, int) else None
+
+    def get_sentence_embedding_dimension(self) -> int:
+        if self._dim is None:
+            self._dim = int(self._encode_batch(["dimension"]).shape[1])
+        return self._dim
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(ids)
+
+        hidden = self.session.run(None, feeds)[0]
+        weights = mask[..., None].astype(np.float32)
+        return (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences, batch_size: int = 32, **_) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        # longest first, so each batch pads to similar lengths
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        out = np.empty((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            rows = order[start : start + batch_size]
+            out[rows] = self._encode_batch([texts[i] for i in rows])
+
+        out = normalize_rows(out)
+        return out[0] if single else out
+
+
+# =========================
+# QUERY EMBEDDING CACHE
+# =========================
+class QueryEmbeddingCache:
+    """LRU of L2-normalized query vectors keyed by normalized text."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> np.ndarray | None:
+        with self._lock:
+            vec = self._data.get(key)
+            if vec is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return vec
+
+    def set(self, key: str, vec: np.ndarray):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = vec
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+# =========================
+# MICRO-BATCHING ENCODER
+# =========================
+class BatchingEncoder:
+    """
+    Coalesce concurrent query encodes into one model.encode() call.
+
+    The first request opens a `window_ms` window; everything that arrives
+    before it closes (or until `max_batch` is reached) is encoded together
+    on a single background thread. Results are L2-normalized float32.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], window_ms: float = 3,
+                 max_batch: int = 64, cache: QueryEmbeddingCache | None = None):
+        self.encode_fn = encode_fn
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.cache = cache
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+        self.stats = {"requests": 0, "cache_hits": 0, "batches": 0, "encoded": 0}
+
+    async def encode(self, text: str) -> np.ndarray:
+        self.stats["requests"] += 1
+        key = normalize(text)
+        if self.cache is not None:
+            vec = self.cache.get(key)
+            if vec is not None:
+                self.stats["cache_hits"] += 1
+                return vec
+
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((key, text, fut))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush, loop)
+
+        return await fut
+
+    async def encode_many(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Bulk path (e.g. /ask/batch): cache lookups, then every miss in one
+        encode call. Returns (len(texts), dim) in input order.
+        """
+        self.stats["requests"] += len(texts)
+        keys = [normalize(t) for t in texts]
+        found: Dict[str, np.ndarray] = {}
+        for key in dict.fromkeys(keys):
+            vec = self.cache.get(key) if self.cache is not None else None
+            if vec is not None:
+                found[key] = vec
+        self.stats["cache_hits"] += sum(1 for key in keys if key in found)
+
+        missing = [k for k in dict.fromkeys(keys) if k not in found]
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            loop = asyncio.get_running_loop()
+            vectors = await loop.run_in_executor(
+                self._executor, self.encode_fn, [text_by_key[k] for k in missing]
+            )
+            self.stats["batches"] += 1
+            self.stats["encoded"] += len(missing)
+            for key, vec in zip(missing, vectors):
+                found[key] = vec
+                if self.cache is not None:
+                    self.cache.set(key, vec)
+
+        return np.stack([found[k] for k in keys])
+
+    def _flush(self, loop: asyncio.AbstractEventLoop):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = loop.create_task(self._run(loop, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, loop: asyncio.AbstractEventLoop, batch: List[Tuple[str, str, asyncio.Future]]):
+        # identical texts in one window are encoded once
+        unique: Dict[str, str] = {}
+        for key, text, _ in batch:
+            unique.setdefault(key, text)
+        keys = list(unique)
+
+        try:
+            vectors = await loop.run_in_executor(
+                self._executor, self.encode_fn, [unique[k] for k in keys]
+            )
+        except Exception as exc:
+            for _, _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+
+        self.stats["batches"] += 1
+        self.stats["encoded"] += len(keys)
+        by_key = dict(zip(keys, vectors))
+        for key, _, fut in batch:
+            vec = by_key[key]
+            if self.cache is not None:
+                self.cache.set(key, vec)
+            if not fut.done():
+                fut.set_result(vec)
+
+
+def make_encode_fn(model) -> Callable[[List[str]], np.ndarray]:
+    def encode(texts: List[str]) -> np.ndarray:
+        return normalize_rows(model.encode(texts, batch_size=max(1, len(texts))))
+
+    return encode
+
+
+# =========================
+# DOCUMENT EMBEDDING CACHE (disk)
+# =========================
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class DocEmbeddingCache:
+    """
+    SQLite store of document vectors keyed by (model, content hash),
+    so re-ingesting unchanged text skips encoding. One connection, shared
+    by threadpool workers: every statement + commit runs under `_lock`.
+    """
+
+    def __init__(self, path: str, model_name: str):
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS doc_embeddings (
+                model TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, hash)
+            )
+            """
+        )
+        self._db.commit()
+
+    def get_many(self, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        for i in range(0, len(unique), 500):
+            part = unique[i : i + 500]
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT hash, vector FROM doc_embeddings WHERE model = ? AND hash IN ({','.join('?' * len(part))})",
+                    (self.model_name, *part),
+                ).fetchall()
+            for h, blob in rows:
+                found[h] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Sequence[Tuple[str, np.ndarray]]):
+        rows = [
+            (self.model_name, h, int(v.shape[0]), np.asarray(v, dtype=np.float32).tobytes())
+            for h, v in items
+        ]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO doc_embeddings VALUES (?, ?, ?, ?)", rows)
+            self._db.commit()
+
+
+def encode_documents(model, texts: Sequence[str], cache: DocEmbeddingCache | None = None,
+                     batch_size: int = 64) -> np.ndarray:
+    """
+    Encode texts, reusing cached vectors for unchanged content.
+    Returns float32 (len(texts), dim) in input order.
+    """
+    if not texts:
+        dim = model.get_sentence_embedding_dimension()
+        return np.zeros((0, dim), dtype=np.float32)
+
+    hashes = [content_hash(t) for t in texts]
+    cached = cache.get_many(hashes) if cache is not None else {}
+
+    missing = list(dict.fromkeys(h for h in hashes if h not in cached))
+    if missing:
+        text_by_hash = dict(zip(hashes, texts))
+        fresh = np.asarray(
+            model.encode([text_by_hash[h] for h in missing], batch_size=batch_size),
+            dtype=np.float32,
+        )
+        new_items = list(zip(missing, fresh))
+        if cache is not None:
+            cache.put_many(new_items)
+        cached.update(new_items)
+
+    return np.stack([cached[h] for h in hashes])
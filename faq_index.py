@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# =========================
+# NORMALIZATION
+# =========================
+_NON_ALNUM_RX = re.compile(r"[^a-z0-9\s]")
+_SPACE_RX = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    text = text.lower().strip()
+    text = _NON_ALNUM_RX.sub("", text)
+    return _SPACE_RX.sub(" ", text)
+
+
+# =========================
+# EXACT-MATCH INDEX
+# =========================
+def build_faq_pairs(nested_data: Dict[str, Dict[str, str]]) -> List[Tuple[str, str]]:
+    pairs = []
+    for _, items in nested_data.items():
+        for q, a in items.items():
+            if isinstance(a, str):
+                pairs.append((q, a))
+    return pairs
+
+
+def build_exact_index(nested_data: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """
+    Map normalized question -> answer + section metadata.
+    First occurrence wins, same as the old linear scan.
+    """
+    index = {}
+    for section, qa_map in nested_data.items():
+        for faq_q, faq_a in qa_map.items():
+            if not isinstance(faq_a, str):
+                continue
+            index.setdefault(normalize(faq_q), {
+                "question": faq_q,
+                "answer": faq_a,
+                "section": section,
+            })
+    return index
+
+
+# =========================
+# SEMANTIC INDEX
+# =========================
+def normalize_rows(matrix) -> np.ndarray:
+    """L2-normalize rows so a dot product is the cosine similarity."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1) if matrix.size else matrix.reshape(0, 0)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_similar(matrix: np.ndarray, query_vec: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    """
+    Top-k (row, cosine score) pairs, best first.
+    Both sides must already be L2-normalized.
+    """
+    if matrix.shape[0] == 0:
+        return []
+    scores = matrix @ query_vec
+    k = max(1, min(k, scores.shape[0]))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return [(int(i), float(scores[i])) for i in top]
+
+
+def top_k_similar_batch(matrix: np.ndarray, query_matrix: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+    """top_k_similar for many queries with one matrix product."""
+    if matrix.shape[0] == 0 or query_matrix.shape[0] == 0:
+        return [[] for _ in range(query_matrix.shape[0])]
+    scores = query_matrix @ matrix.T
+    k = max(1, min(k, scores.shape[1]))
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    results = []
+    for row, cols in zip(scores, top):
+        cols = cols[np.argsort(-row[cols])]
+        results.append([(int(i), float(row[i])) for i in cols])
+    return results
+
+
+# =========================
+# PREBUILT ARTIFACTS (written by ingest.py, loaded by api_server.py)
+# =========================
+# <dir>/faq_embeddings.npy  float32 (n_faqs, dim), L2-normalized, build_faq_pairs order
+# <dir>/faq.json            {"model", "dim", "count", "sources": {path: sha256}, "nested": {...}}
+# "model" is embeddings.cache_model_id(): ONNX-built vectors do not pass for torch ones
+FAQ_EMBEDDINGS_FILE = "faq_embeddings.npy"
+FAQ_META_FILE = "faq.json"
+
+
+def file_digest(path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def save_faq_artifacts(out_dir, nested_data: Dict[str, Dict[str, str]], embeddings: np.ndarray,
+                       model_name: str, sources: Dict[str, str]):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    matrix = normalize_rows(embeddings)
+
+    # vectors first, metadata last: a reader never sees new metadata with old vectors
+    tmp = out_dir / (FAQ_EMBEDDINGS_FILE + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, matrix)
+    os.replace(tmp, out_dir / FAQ_EMBEDDINGS_FILE)
+
+    meta = {
+        "model": model_name,
+        "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        "count": int(matrix.shape[0]),
+        "sources": sources,
+        "nested": nested_data,
+    }
+    tmp = out_dir / (FAQ_META_FILE + ".tmp")
+    tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, out_dir / FAQ_META_FILE)
+
+
+def load_faq_artifacts(out_dir, model_name: str) -> Tuple[Dict[str, Dict[str, str]], np.ndarray]:
+    """
+    (nested data, memory-mapped FAQ matrix).
+    Raises FileNotFoundError if missing, ValueError if built for another
+    model/backend or from handbook files that have changed since.
+    """
+    out_dir = Path(out_dir)
+    meta = json.loads((out_dir / FAQ_META_FILE).read_text(encoding="utf-8"))
+    if meta["model"] != model_name:
+        raise ValueError(f"built for {meta['model']}, serving {model_name}")
+    for path, digest in meta["sources"].items():
+        if not Path(path).exists() or file_digest(path) != digest:
+            raise ValueError(f"{path} changed since the artifacts were built")
+
+    matrix = np.load(out_dir / FAQ_EMBEDDINGS_FILE, mmap_mode="r")
+    if matrix.shape[0] != meta["count"]:
+        raise ValueError("embedding count does not match metadata")
+    return meta["nested"], matrix
@@ -0,0 +1,115 @@
+import gzip
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:  # optional: gzip only without it
+    import brotli
+except ImportError:
+    brotli = None
+
+# smaller bodies are sent as they are (compression would not pay for the header)
+MIN_COMPRESS_BYTES = 256
+# preference order when the client accepts several
+ENCODINGS = ("br", "gzip")
+# eager bodies (whole catalogues, static files) are compressed once, as small as
+# possible; lazy ones (pages) only for the encoding a client asks for, cheaply
+EAGER_QUALITY = {"gzip": 9, "br": 11}
+LAZY_QUALITY = {"gzip": 6, "br": 5}
+
+
+def compress(body: bytes, encoding: str, quality: int) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=quality, mtime=0)
+    return brotli.compress(body, quality=quality)
+
+
+class CachedBody:
+    """
+    One response body, serialized once; each encoding compressed at most
+    once (all up front when `eager`, else on first use). Each encoding has
+    its own strong ETag ("<digest>", "<digest>-gzip", "<digest>-br"); any of
+    them in If-None-Match revalidates.
+    """
+
+    __slots__ = ("media_type", "digest", "encodings", "quality", "bodies")
+
+    def __init__(self, body: bytes, media_type: str, eager: bool = True):
+        self.media_type = media_type
+        self.digest = hashlib.sha256(body).hexdigest()[:20]
+        self.encodings: Tuple[str, ...] = ("identity",)
+        if len(body) >= MIN_COMPRESS_BYTES:
+            self.encodings += tuple(e for e in ENCODINGS if e != "br" or brotli is not None)
+        self.quality = EAGER_QUALITY if eager else LAZY_QUALITY
+        self.bodies: Dict[str, bytes] = {"identity": body}
+        if eager:
+            for encoding in self.encodings:
+                self.body(encoding)
+
+    @classmethod
+    def from_json(cls, data, eager: bool = True) -> "CachedBody":
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return cls(body, "application/json", eager)
+
+    @classmethod
+    def from_file(cls, path: Path, media_type: str) -> "CachedBody":
+        return cls(path.read_bytes(), media_type)
+
+    def body(self, encoding: str) -> bytes:
+        # concurrent first uses may both compress; same bytes either way
+        data = self.bodies.get(encoding)
+        if data is None:
+            data = compress(self.bodies["identity"], encoding, self.quality[encoding])
+            self.bodies[encoding] = data
+        return data
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(b) for b in self.bodies.values())
+
+    def etag(self, encoding: str = "identity") -> str:
+        return f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+
+    def matches(self, if_none_match: str | None) -> bool:
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or any(self.etag(encoding) in tags for encoding in self.encodings)
+
+
+def accepted_encoding(accept_encoding: str | None, available) -> str:
+    """Best of ENCODINGS the client accepts (q > 0) and we have, else identity."""
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    for encoding in ENCODINGS:
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return "identity"
+
+
+def cached_response(request: Request, cached: CachedBody, cache_control: str) -> Tuple[Response, str]:
+    """(response, outcome): 304 when the client's copy is current, else the best encoding."""
+    headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if cached.matches(request.headers.get("if-none-match")):
+        encoding = accepted_encoding(request.headers.get("accept-encoding"), cached.encodings)
+        headers["ETag"] = cached.etag(encoding)
+        return Response(status_code=304, headers=headers), "not_modified"
+
+    encoding = accepted_encoding(request.headers.get("accept-encoding"), cached.encodings)
+    headers["ETag"] = cached.etag(encoding)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(cached.body(encoding), media_type=cached.media_type, headers=headers), encoding
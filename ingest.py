@@ -1,27 +1,89 @@
 # ingest.py
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
+import hashlib
+import json
 import os
+import shutil
 import uuid
 import socket
-from typing import List
+from typing import Deque, Dict, Iterable, Iterator, List, Tuple
 
-from qdrant_client import QdrantClient
-from qdrant_client.models import VectorParams, Distance, PointStruct
-from sentence_transformers import SentenceTransformer
+from qdrant_client import QdrantClient, models
+from qdrant_client.models import PointIdsList, PointStruct
 import httpcore
+import numpy as np
+
+from app import HANDBOOK_FILES, iter_handbook_files, merge_handbooks, parse_corpus_spec, parse_handbook
+from chunking import chunk_handbook
+from corpus_version import write_corpus_version
+from embeddings import DocEmbeddingCache, cache_model_id, encode_documents, load_embedder
+from faq_index import (
+    FAQ_EMBEDDINGS_FILE,
+    FAQ_META_FILE,
+    file_digest,
+    normalize_rows,
+    save_faq_artifacts,
+)
+from qdrant_profiles import (
+    PAYLOAD_INDEXES,
+    collection_params,
+    lean_payload,
+    payload_index_schema,
+    quantization_config,
+    resolve_profile,
+)
+from retrievers import META_FILE, PAYLOADS_FILE, TENANT_FIELD, VECTORS_FILE
 
 # CONFIG (can be overridden via env)
-DATA_FILE = Path(os.getenv("DATA_FILE", "data/motor_insurance.txt"))
+# comma-separated handbook files and/or directories of *.txt; "tenant/product=path" names
+# the corpus of its chunks and FAQ artifacts (else the file stem). The same setting as
+# api_server's: app.HANDBOOK_FILES (HANDBOOK_FILES, else DATA_PATHS, else DATA_FILE)
+DATA_SPEC = HANDBOOK_FILES
+DATA_PATHS = [path for _, path in parse_corpus_spec(DATA_SPEC)]
+# one collection per corpus (api_server TENANT_ROUTING=collection): one run per corpus with its COLLECTION_NAME
 COLLECTION_NAME = os.getenv("COLLECTION_NAME", "documents")
 EMBED_MODEL_NAME = os.getenv(
     "EMBED_MODEL_NAME", "all-MiniLM-L6-v2"
 )
+# torch | onnx | onnx-int8 (see embeddings.load_embedder); ONNX files from EMBED_ONNX_DIR or the HF repo
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch").lower()
+EMBED_ONNX_DIR = os.getenv("EMBED_ONNX_DIR") or None
+EMBED_ONNX_THREADS = int(os.getenv("EMBED_ONNX_THREADS", 0))
+# model + backend: keys point ids, the local index and FAQ artifacts, so switching backend re-embeds
+EMBED_MODEL_ID = cache_model_id(EMBED_MODEL_NAME, EMBED_BACKEND)
 QDRANT_HOST = os.getenv("QDRANT_HOST", "qdrant")  # default service name for docker-compose
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", 6333))
+# local-mode collection directory instead of a server (api_server reads it with the same QDRANT_PATH)
+QDRANT_PATH = os.getenv("QDRANT_PATH") or None
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", 256))
+# vector/payload layout of the collection: float | scalar | binary (see qdrant_profiles.py)
+COLLECTION_PROFILE = resolve_profile()
+# content-hash keyed vector store; unchanged lines are not re-encoded on re-ingest
+EMBED_DOC_CACHE = os.getenv("EMBED_DOC_CACHE", "data/.embed_cache.sqlite")
+# chunking (approximate tokens, see chunking.count_tokens)
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", 200))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", 40))
+# what is already indexed: {"collection", "sources": {source: [point ids]}}
+# plus a "<manifest>.journal" of completed batches, replayed after a crash
+INGEST_MANIFEST = Path(os.getenv("INGEST_MANIFEST", "data/.ingest_manifest.json"))
+# pipeline: upserts run on a thread pool while the next batch is encoded
+INGEST_UPSERT_WORKERS = int(os.getenv("INGEST_UPSERT_WORKERS", 4))
+INGEST_MAX_INFLIGHT = int(os.getenv("INGEST_MAX_INFLIGHT", 8))
+# where to index: qdrant | local | both (local = in-process index for RETRIEVER_BACKEND=numpy/faiss)
+INGEST_BACKEND = os.getenv("INGEST_BACKEND", "qdrant").lower()
+LOCAL_INDEX_DIR = Path(os.getenv("LOCAL_INDEX_DIR", "data/index"))
+# FAQ data + question embeddings for api_server's fast start ("" disables)
+FAQ_ARTIFACT_DIR = os.getenv("FAQ_ARTIFACT_DIR", "data/faq")
+
+# fixed namespace so the same chunk always maps to the same point id
+POINT_ID_NAMESPACE = uuid.UUID("6f1d3c0e-6b8a-4c55-9d0c-2f6a1f7e9b41")
 
 
 def load_sentences(path: Path) -> List[str]:
+    """Legacy one-point-per-line input (kept for benchmarks/bench_chunking.py)."""
     if not path.exists():
         raise FileNotFoundError(f"Data file not found: {path}")
     text = path.read_text(encoding="utf-8")
@@ -29,36 +91,198 @@ def load_sentences(path: Path) -> List[str]:
     return sentences
 
 
-def ensure_collection(client: QdrantClient, name: str, dim: int):
+def iter_data_files(spec: str = DATA_SPEC) -> Iterator[Tuple[str, Path]]:
+    """
+    (corpus, file) per handbook, the corpus named exactly as api_server names
+    it (app.iter_handbook_files), so tenant routing finds these chunks.
+    """
+    for corpus, path in iter_handbook_files(spec):
+        if not path.exists():
+            raise FileNotFoundError(f"Data file not found: {path}")
+        yield corpus, path
+
+
+def load_chunks(path: Path, corpus: str | None = None) -> List[dict]:
+    if not path.exists():
+        raise FileNotFoundError(f"Data file not found: {path}")
+    chunks = chunk_handbook(path, max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS)
+    if corpus:
+        for chunk in chunks:
+            chunk[TENANT_FIELD] = corpus
+    return chunks
+
+
+def load_model() -> Tuple[object, DocEmbeddingCache | None]:
+    """(embedding model, doc embedding cache) for the configured backend."""
+    model = load_embedder(EMBED_MODEL_NAME, EMBED_BACKEND, onnx_dir=EMBED_ONNX_DIR, threads=EMBED_ONNX_THREADS)
+    doc_cache = DocEmbeddingCache(EMBED_DOC_CACHE, EMBED_MODEL_ID) if EMBED_DOC_CACHE else None
+    return model, doc_cache
+
+
+def point_id(chunk: dict, model_name: str = EMBED_MODEL_ID) -> str:
+    """Deterministic id from chunk content + payload + embedding model/backend."""
+    digest = hashlib.sha256(
+        json.dumps([model_name, chunk], sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, digest))
+
+
+# =========================
+# MANIFEST
+# =========================
+def journal_path(manifest_path: Path) -> Path:
+    return manifest_path.with_name(manifest_path.name + ".journal")
+
+
+def load_manifest(path: Path, collection: str) -> Dict[str, List[str]]:
+    """
+    source -> point ids; empty if missing or written for another collection.
+    Batches journaled by an interrupted run are replayed on top.
+    """
+    sources: Dict[str, List[str]] = {}
+    if path.exists():
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("collection") == collection:
+            sources = data.get("sources", {})
+
+    journal = journal_path(path)
+    if journal.exists():
+        replayed = 0
+        with open(journal, encoding="utf-8") as f:
+            for line in f:
+                name, source, pid = line.rstrip("\n").split("\t")
+                if name == collection:
+                    sources.setdefault(source, []).append(pid)
+                    replayed += 1
+        print(f"[manifest] Resuming: {replayed} points from an interrupted run")
+    return sources
+
+
+def append_journal(path: Path, collection: str, done: List[Tuple[str, str]]):
+    """Checkpoint one completed batch of (source, point id)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(journal_path(path), "a", encoding="utf-8") as f:
+        f.writelines(f"{collection}\t{source}\t{pid}\n" for source, pid in done)
+
+
+def save_manifest(path: Path, collection: str, sources: Dict[str, List[str]]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"collection": collection, "sources": sources}), encoding="utf-8")
+    tmp.replace(path)
+    journal_path(path).unlink(missing_ok=True)
+
+
+def collection_exists(client: QdrantClient, name: str) -> bool:
     try:
-        cols = client.get_collections().collections
-        exists = any(c.name == name for c in cols)
+        return any(c.name == name for c in client.get_collections().collections)
     except Exception:
-        exists = False
+        return False
+
 
-    if exists:
+def scroll_source_ids(client: QdrantClient, name: str) -> Dict[str, List[str]]:
+    """Rebuild source -> ids from the collection itself."""
+    sources: Dict[str, List[str]] = {}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=name,
+            limit=1000,
+            offset=offset,
+            with_payload=["source"],
+            with_vectors=False,
+        )
+        for p in points:
+            source = (p.payload or {}).get("source", "")
+            sources.setdefault(source, []).append(str(p.id))
+        if offset is None:
+            return sources
+
+
+def indexed_ids(client: QdrantClient, name: str, manifest: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Trust the manifest while it matches the collection size;
+    otherwise (first run, manual edits, legacy random ids) reconcile from Qdrant.
+    """
+    if not collection_exists(client, name):
+        return {}
+    count = client.count(collection_name=name, exact=True).count
+    if count == sum(len(ids) for ids in manifest.values()):
+        return manifest
+    print(f"[manifest] Out of sync with '{name}' ({count} points) — rebuilding from Qdrant ...")
+    return scroll_source_ids(client, name)
+
+
+def ensure_collection(client: QdrantClient, name: str, dim: int):
+    profile = COLLECTION_PROFILE
+    if collection_exists(client, name):
         print(f"[qdrant] Collection '{name}' already exists")
+        apply_profile(client, name)
+    else:
+        print(f"[qdrant] Creating collection '{name}' (dim={dim}, profile={profile['name']}) ...")
+        client.create_collection(collection_name=name, **collection_params(profile, dim))
+        # verify creation
+        cols_after = client.get_collections().collections
+        if not any(c.name == name for c in cols_after):
+            raise RuntimeError(f"Failed to create collection '{name}'")
+        print(f"[qdrant] Created collection '{name}'")
+    ensure_payload_indexes(client, name)
+
+
+def apply_profile(client: QdrantClient, name: str):
+    """
+    Move an existing collection to COLLECTION_PROFILE (quantization, on-disk
+    vectors/payload, HNSW). Qdrant rebuilds in the background; no re-upload.
+    """
+    profile = COLLECTION_PROFILE
+    config = client.get_collection(name).config
+    want_quant = quantization_config(profile)
+    have_quant = config.quantization_config
+
+    quant_changed = (have_quant.model_dump() if have_quant else None) != (
+        want_quant.model_dump() if want_quant else None
+    )
+    vectors = config.params.vectors
+    on_disk_changed = bool(getattr(vectors, "on_disk", False)) != profile["on_disk"]
+    payload_changed = bool(config.params.on_disk_payload) != profile["on_disk_payload"]
+    hnsw_changed = (config.hnsw_config.m, config.hnsw_config.ef_construct) != (
+        profile["hnsw_m"], profile["hnsw_ef_construct"]
+    )
+    if not (quant_changed or on_disk_changed or payload_changed or hnsw_changed):
         return
 
-    print(f"[qdrant] Creating collection '{name}' (dim={dim}) ...")
-    client.create_collection(
+    print(f"[qdrant] Applying profile '{profile['name']}' to '{name}' ...")
+    client.update_collection(
         collection_name=name,
-        vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
+        vectors_config={"": models.VectorParamsDiff(on_disk=profile["on_disk"])} if on_disk_changed else None,
+        hnsw_config=models.HnswConfigDiff(m=profile["hnsw_m"], ef_construct=profile["hnsw_ef_construct"])
+        if hnsw_changed else None,
+        quantization_config=(want_quant or models.Disabled.DISABLED) if quant_changed else None,
+        collection_params=models.CollectionParamsDiff(on_disk_payload=profile["on_disk_payload"])
+        if payload_changed else None,
     )
-    # verify creation
-    cols_after = client.get_collections().collections
-    if not any(c.name == name for c in cols_after):
-        raise RuntimeError(f"Failed to create collection '{name}'")
-    print(f"[qdrant] Created collection '{name}'")
 
 
-def upsert_in_batches(client: QdrantClient, name: str, points: List[PointStruct]):
-    total = len(points)
-    print(f"[qdrant] Upserting {total} points in batches of {BATCH_SIZE} ...")
-    for i in range(0, total, BATCH_SIZE):
-        batch = points[i : i + BATCH_SIZE]
-        client.upsert(collection_name=name, points=batch)
-        print(f"  upserted {i + len(batch)}/{total}")
+def ensure_payload_indexes(client: QdrantClient, name: str):
+    existing = client.get_collection(name).payload_schema or {}
+    for field in PAYLOAD_INDEXES:
+        if field not in existing:
+            client.create_payload_index(
+                collection_name=name,
+                field_name=field,
+                field_schema=payload_index_schema(field),
+            )
+
+
+def upsert_batch(client: QdrantClient, name: str, points: List[PointStruct]) -> int:
+    client.upsert(collection_name=name, points=points)
+    return len(points)
+
+
+def batched(iterable: Iterable, n: int) -> Iterator[list]:
+    it = iter(iterable)
+    while batch := list(islice(it, n)):
+        yield batch
 
 
 def try_connect(host: str, port: int):
@@ -97,37 +321,253 @@ def get_working_client(preferred_host: str, port: int):
     )
 
 
-def main():
-    print(f"[data] Loading text from {DATA_FILE} ...")
-    sentences = load_sentences(DATA_FILE)
-    if not sentences:
-        print("[data] No sentences found — exiting")
-        return
-    print(f"[data] Loaded {len(sentences)} lines")
+# =========================
+# PIPELINE: read -> chunk -> batch-encode -> upsert
+# =========================
+def iter_new_chunks(files: Iterable[Tuple[str, Path]], indexed: Dict[str, List[str]],
+                    current: Dict[str, List[str]], removed: Dict[str, List[str]],
+                    stats: Dict[str, int]) -> Iterator[Tuple[str, str, dict]]:
+    """
+    Lazily chunk one file at a time and yield only (source, id, chunk)
+    not already indexed. Fills `current` (source -> ids) and `removed`
+    (source -> stale ids) as each file is consumed.
+    """
+    for corpus, path in files:
+        source = str(path)
+        by_id = {}
+        for chunk in load_chunks(path, corpus):
+            by_id.setdefault(point_id(chunk), chunk)
+
+        known = set(indexed.get(source, []))
+        current[source] = list(by_id)
+        removed[source] = sorted(known - set(by_id))
+        fresh = [pid for pid in by_id if pid not in known]
+        stats["chunks"] += len(by_id)
+        stats["new"] += len(fresh)
+        stats["removed"] += len(removed[source])
+        print(f"[data] {source}: {len(by_id)} chunks, {len(fresh)} new/changed, {len(removed[source])} removed")
+
+        for pid in fresh:
+            yield source, pid, by_id[pid]
+
+
+def run_pipeline(client: QdrantClient, new_chunks: Iterator[Tuple[str, str, dict]],
+                 indexed: Dict[str, List[str]]) -> int:
+    """
+    Encode batch N on this thread while up to INGEST_MAX_INFLIGHT earlier
+    batches upsert on INGEST_UPSERT_WORKERS threads. Each finished batch is
+    journaled, so a crashed run resumes after its last completed batch.
+    """
+    model, doc_cache, collection_ready = None, None, False
+    inflight: Deque[Tuple[Future, List[Tuple[str, str]]]] = deque()
+    upserted = 0
+
+    def drain_one():
+        nonlocal upserted
+        fut, done = inflight.popleft()
+        upserted += fut.result()
+        append_journal(INGEST_MANIFEST, COLLECTION_NAME, done)
+        for source, pid in done:
+            indexed.setdefault(source, []).append(pid)
+        print(f"  upserted {upserted} points")
+
+    with ThreadPoolExecutor(max_workers=INGEST_UPSERT_WORKERS, thread_name_prefix="upsert") as pool:
+        for batch in batched(new_chunks, BATCH_SIZE):
+            if model is None:
+                print(f"[embed] Loading model: {EMBED_MODEL_NAME} ({EMBED_BACKEND}) ...")
+                model, doc_cache = load_model()
+
+            vectors = encode_documents(model, [chunk["text"] for _, _, chunk in batch], doc_cache)
+            if not collection_ready:
+                ensure_collection(client, COLLECTION_NAME, vectors.shape[1])
+                collection_ready = True
+
+            points = [
+                PointStruct(id=pid, vector=vectors[i].tolist(), payload=lean_payload(chunk))
+                for i, (_, pid, chunk) in enumerate(batch)
+            ]
+            fut = pool.submit(upsert_batch, client, COLLECTION_NAME, points)
+            inflight.append((fut, [(source, pid) for source, pid, _ in batch]))
 
-    print(f"[embed] Loading model: {EMBED_MODEL_NAME} ...")
-    model = SentenceTransformer(EMBED_MODEL_NAME)
-    vectors = model.encode(sentences)
-    dim = vectors.shape[1] if hasattr(vectors, "shape") else len(vectors[0])
-    print(f"[embed] Got vectors with dim={dim}")
+            while len(inflight) >= INGEST_MAX_INFLIGHT:
+                drain_one()
 
-    print(f"[qdrant] Attempting to connect (preferred host from env: '{QDRANT_HOST}') ...")
-    client = get_working_client(QDRANT_HOST, QDRANT_PORT)
+        while inflight:
+            drain_one()
 
-    # ensure collection exists
-    ensure_collection(client, COLLECTION_NAME, dim)
+    return upserted
 
-    # prepare PointStructs
-    print("[qdrant] Preparing points ...")
-    points = [
-        PointStruct(id=str(uuid.uuid4()), vector=vectors[i].tolist(), payload={"text": sentences[i], "source": str(DATA_FILE)})
-        for i in range(len(sentences))
-    ]
 
-    # upsert in batches
-    upsert_in_batches(client, COLLECTION_NAME, points)
+def ingest_qdrant(files: List[Tuple[str, Path]]) -> str | None:
+    """Incremental Qdrant ingestion; returns a content digest if anything changed."""
+    if QDRANT_PATH:
+        print(f"[qdrant] Local mode in {QDRANT_PATH}")
+        client = QdrantClient(path=QDRANT_PATH)
+    else:
+        print(f"[qdrant] Attempting to connect (preferred host from env: '{QDRANT_HOST}') ...")
+        client = get_working_client(QDRANT_HOST, QDRANT_PORT)
+
+    indexed = indexed_ids(client, COLLECTION_NAME, load_manifest(INGEST_MANIFEST, COLLECTION_NAME))
+    if collection_exists(client, COLLECTION_NAME):
+        # profile changes apply even when no chunk changed
+        apply_profile(client, COLLECTION_NAME)
+        ensure_payload_indexes(client, COLLECTION_NAME)
+    current: Dict[str, List[str]] = {}
+    removed: Dict[str, List[str]] = {}
+    stats = {"chunks": 0, "new": 0, "removed": 0}
+
+    new_chunks = iter_new_chunks(files, indexed, current, removed, stats)
+    upserted = run_pipeline(client, new_chunks, indexed)
+
+    # handbooks no longer ingested: dropped from DATA_PATHS or deleted from an ingested directory
+    for source in list(indexed):
+        if source not in current:
+            removed[source] = indexed[source]
+            stats["removed"] += len(indexed[source])
+            print(f"[data] {source}: no longer in DATA_PATHS, {len(indexed[source])} removed")
+
+    print(f"[diff] {stats['new']} new/changed, {stats['removed']} removed, "
+          f"{stats['chunks'] - stats['new']} unchanged")
+
+    stale = [pid for ids in removed.values() for pid in ids]
+    if stale:
+        print(f"[qdrant] Deleting {len(stale)} stale points ...")
+        for part in batched(stale, BATCH_SIZE):
+            client.delete(collection_name=COLLECTION_NAME, points_selector=PointIdsList(points=part))
+
+    for source in removed:
+        if source not in current:
+            indexed.pop(source, None)
+    indexed.update(current)
+    save_manifest(INGEST_MANIFEST, COLLECTION_NAME, indexed)
+
+    if not upserted and not stale:
+        print("✅ Qdrant index already up to date — nothing to do")
+        return None
 
     print("✅ Successfully stored text into Qdrant!")
+    all_ids = sorted(pid for ids in indexed.values() for pid in ids)
+    return hashlib.sha256("\n".join(all_ids).encode("utf-8")).hexdigest()
+
+
+# =========================
+# LOCAL INDEX (RETRIEVER_BACKEND=numpy|faiss)
+# =========================
+def build_local_index(files: List[Tuple[str, Path]], index_dir: Path) -> str | None:
+    """
+    Stream every chunk into <index_dir>.tmp (raw float32 + payload lines),
+    then finalize into vectors.npy and swap the directory in atomically.
+    Unchanged chunks come from the doc embedding cache, so a rebuild is cheap.
+    Returns the content digest if the index changed.
+    """
+    tmp_dir = index_dir.with_name(index_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    model, doc_cache = load_model()
+    dim = model.get_sentence_embedding_dimension()
+    stats = {"chunks": 0, "new": 0, "removed": 0}
+    ids = []
+
+    raw_path = tmp_dir / "vectors.f32"
+    with open(raw_path, "wb") as raw, open(tmp_dir / PAYLOADS_FILE, "w", encoding="utf-8") as payloads:
+        chunks = iter_new_chunks(files, {}, {}, {}, stats)
+        for batch in batched(chunks, BATCH_SIZE):
+            vectors = normalize_rows(encode_documents(model, [c["text"] for _, _, c in batch], doc_cache))
+            raw.write(vectors.astype(np.float32).tobytes())
+            for _, pid, chunk in batch:
+                payloads.write(json.dumps({"id": pid, **chunk}, ensure_ascii=False) + "\n")
+                ids.append(pid)
+
+    count = len(ids)
+    digest = hashlib.sha256("\n".join(sorted(ids)).encode("utf-8")).hexdigest()
+    old_meta = index_dir / META_FILE
+    if old_meta.exists() and json.loads(old_meta.read_text(encoding="utf-8")).get("digest") == digest:
+        shutil.rmtree(tmp_dir)
+        print(f"✅ Local index {index_dir} already up to date — nothing to do")
+        return None
+
+    src = np.memmap(raw_path, dtype=np.float32, mode="r", shape=(count, dim))
+    dst = np.lib.format.open_memmap(tmp_dir / VECTORS_FILE, mode="w+", dtype=np.float32, shape=(count, dim))
+    for i in range(0, count, 65536):
+        dst[i : i + 65536] = src[i : i + 65536]
+    dst.flush()
+    del src, dst
+    raw_path.unlink()
+
+    (tmp_dir / META_FILE).write_text(
+        json.dumps({"model": EMBED_MODEL_ID, "dim": dim, "count": count, "digest": digest}),
+        encoding="utf-8",
+    )
+
+    old_dir = index_dir.with_name(index_dir.name + ".old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if index_dir.exists():
+        index_dir.rename(old_dir)
+    tmp_dir.rename(index_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    print(f"✅ Local index written to {index_dir} ({count} vectors, dim={dim})")
+    return digest
+
+
+# =========================
+# FAQ ARTIFACTS (api_server fast start)
+# =========================
+def build_faq_artifacts(files: List[Path], out_dir: Path):
+    """
+    Parsed Q&A of every handbook (merged by section, file order) and the
+    normalized FAQ question matrix, so api_server starts without parsing
+    or encoding. Skipped when already built from the same files and model.
+    """
+    sources = {str(path): file_digest(path) for path in files}
+    meta_path = out_dir / FAQ_META_FILE
+    if meta_path.exists() and (out_dir / FAQ_EMBEDDINGS_FILE).exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("model") == EMBED_MODEL_ID and meta.get("sources") == sources:
+            print(f"✅ FAQ artifacts in {out_dir} already up to date — nothing to do")
+            return
+
+    merged = merge_handbooks(parse_handbook(path) for path in files)
+    nested = merged.to_nested()
+    questions = list(merged.questions)
+    model, doc_cache = load_model()
+    embeddings = encode_documents(model, questions, doc_cache)
+    save_faq_artifacts(out_dir, nested, embeddings, EMBED_MODEL_ID, sources)
+    print(f"✅ FAQ artifacts written to {out_dir} ({len(questions)} questions)")
+
+
+def main():
+    files = list(iter_data_files())
+    if not files:
+        print("[data] No handbook files found — exiting")
+        return
+    print(f"[data] {len(files)} handbook file(s) from {', '.join(map(str, DATA_PATHS))}")
+
+    if INGEST_BACKEND not in ("qdrant", "local", "both"):
+        raise ValueError(f"Unknown INGEST_BACKEND: {INGEST_BACKEND!r}")
+
+    digests = []
+    if INGEST_BACKEND in ("qdrant", "both"):
+        digests.append(ingest_qdrant(files))
+    if INGEST_BACKEND in ("local", "both"):
+        print(f"[local] Building in-process index in {LOCAL_INDEX_DIR} ...")
+        digests.append(build_local_index(files, LOCAL_INDEX_DIR))
+
+    if FAQ_ARTIFACT_DIR:
+        build_faq_artifacts([path for _, path in files], Path(FAQ_ARTIFACT_DIR))
+        # per corpus, for api_server's tenant FAQ tiers (FAQ_ARTIFACT_DIR/<tenant>/<product>)
+        by_corpus: Dict[str, List[Path]] = {}
+        for corpus, path in files:
+            by_corpus.setdefault(corpus, []).append(path)
+        for corpus, corpus_files in by_corpus.items():
+            build_faq_artifacts(corpus_files, Path(FAQ_ARTIFACT_DIR) / corpus)
+
+    changed = [d for d in digests if d]
+    if changed:
+        # new corpus version -> api_server drops answers cached against the old corpus
+        version = write_corpus_version(hashlib.sha256("".join(changed).encode("utf-8")).hexdigest())
+        print(f"[corpus] version {version}")
 
 
 if __name__ == "__main__":
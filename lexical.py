@@ -0,0 +1,101 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Sequence
+
+from retrievers import TENANT_FIELD, Hit
+
+# =========================
+# TOKENIZER
+# =========================
+_TOKEN_RX = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i if in is it its "
+    "me my of on or so that the their there this to was what when where which who "
+    "will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word/number terms without stopwords, plus "term_number"
+    bigrams so exact references such as "Form 29" or "Rule 141" stay distinct.
+    """
+    words = _TOKEN_RX.findall(text.lower())
+    terms = [w for w in words if w not in _STOPWORDS]
+    for prev, cur in zip(words, words[1:]):
+        if cur.isdigit() and not prev.isdigit():
+            terms.append(f"{prev}_{cur}")
+    return terms
+
+
+# =========================
+# BM25
+# =========================
+class BM25Index:
+    """Okapi BM25 over an in-memory inverted index of chunk payloads."""
+
+    def __init__(self, payloads: Iterable[Dict], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.payloads: List[Dict] = []
+        self.doc_len: List[int] = []
+        self.postings: Dict[str, List[tuple]] = defaultdict(list)
+
+        for payload in payloads:
+            terms = Counter(tokenize(payload.get("text", "")))
+            doc = len(self.payloads)
+            self.payloads.append(payload)
+            self.doc_len.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self.postings[term].append((doc, tf))
+
+        n = len(self.payloads)
+        self.avg_len = (sum(self.doc_len) / n) if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def __len__(self):
+        return len(self.payloads)
+
+    def search(self, query: str, k: int, corpus: str | None = None) -> List[Hit]:
+        """Top-k chunks; with `corpus`, only chunks tagged with it."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[doc] / self.avg_len)
+                scores[doc] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        items = scores.items()
+        if corpus is not None:
+            items = [(doc, score) for doc, score in items if self.payloads[doc].get(TENANT_FIELD) == corpus]
+        top = sorted(items, key=lambda item: item[1], reverse=True)[:k]
+        return [
+            Hit(str(self.payloads[doc].get("id", doc)), score, self.payloads[doc])
+            for doc, score in top
+        ]
+
+
+# =========================
+# FUSION
+# =========================
+def reciprocal_rank_fusion(rankings: Sequence[List[Hit]], weights: Sequence[float],
+                           limit: int, rrf_k: int = 60) -> List[Hit]:
+    """
+    Weighted RRF: score(d) = sum_i w_i / (rrf_k + rank_i(d)).
+    Hits are matched by id; the first list's payload wins.
+    """
+    fused: Dict[str, float] = defaultdict(float)
+    payloads: Dict[str, Dict] = {}
+    for hits, weight in zip(rankings, weights):
+        for rank, hit in enumerate(hits, start=1):
+            fused[hit.id] += weight / (rrf_k + rank)
+            payloads.setdefault(hit.id, hit.payload)
+
+    top = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [Hit(hid, score, payloads[hid]) for hid, score in top]
@@ -0,0 +1,321 @@
+import asyncio
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Deque, Dict, Mapping, TypeVar
+
+import aiohttp
+
+T = TypeVar("T")
+
+# upstream statuses worth another attempt (rate limited / overloaded / flaky)
+RETRYABLE_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class LLMUnavailable(Exception):
+    """The LLM was not asked (breaker open, over quota) or kept failing; answer with the fallback."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+# =========================
+# RATE LIMIT (token bucket)
+# =========================
+class TokenBucket:
+    """
+    `rate` units per second, up to `capacity` banked. take() may drive the
+    balance negative: later callers wait for the debt (reservation style,
+    so waiters are served in arrival order without a queue).
+    rate <= 0 disables the bucket.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, n: float) -> float:
+        """Seconds until `n` units are available (0 if now)."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        return max(0.0, (min(n, self.capacity) - self.tokens) / self.rate)
+
+    def take(self, n: float):
+        if self.rate > 0:
+            self._refill()
+            self.tokens -= n
+
+    @classmethod
+    def per_minute(cls, limit: float) -> "TokenBucket":
+        return cls(limit / 60.0, limit)
+
+
+# =========================
+# CIRCUIT BREAKER
+# =========================
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures.
+    open -> half_open after `reset_timeout` s: one probe call is let through
+    per reset_timeout; its success closes the breaker, a failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self.stats = {"opened": 0, "rejected": 0}
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        now = time.monotonic()
+        if now - self._opened_at >= self.reset_timeout:
+            # (re)arm the window, so a probe that never reports back only delays the next one
+            self.state = "half_open"
+            self._opened_at = now
+            return True
+        self.stats["rejected"] += 1
+        return False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state == "closed":
+                self.stats["opened"] += 1
+            self.state = "open"
+            self._opened_at = time.monotonic()
+
+
+# =========================
+# LATENCY (hedging threshold)
+# =========================
+class LatencyWindow:
+    """Recent successful call latencies; quantile() once `min_samples` are in."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+# =========================
+# ERRORS
+# =========================
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status in RETRYABLE_STATUSES
+    return isinstance(exc, (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError))
+
+
+def retry_after_seconds(headers: Mapping[str, str] | None) -> float | None:
+    """Retry-After as seconds (delta-seconds or HTTP date)."""
+    value = (headers or {}).get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# =========================
+# CLIENT
+# =========================
+class LLMClient:
+    """
+    Wraps one upstream call (a coroutine factory) with, in order:
+    circuit breaker -> token buckets (requests + tokens per minute) ->
+    attempt (optionally hedged) -> retry with jittered backoff / Retry-After.
+
+    Raises LLMUnavailable instead of queueing when the breaker is open, when
+    the quota wait would exceed `max_queue_wait`, when retryable failures
+    outlast `max_retries`, or when upstream rejects the request (e.g. 400/401:
+    no retry, but it did answer, so the breaker counts it as a success).
+    Other errors propagate unchanged (and count as breaker failures).
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_queue_wait: float = 5.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.25,
+        backoff_max: float = 4.0,
+        max_retry_after: float = 10.0,
+        breaker: CircuitBreaker | None = None,
+        hedge_after: float = 0.0,
+        hedge_quantile: float = 0.0,
+    ):
+        self.request_bucket = TokenBucket.per_minute(requests_per_minute)
+        self.token_bucket = TokenBucket.per_minute(tokens_per_minute)
+        self.max_queue_wait = max_queue_wait
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.breaker = breaker or CircuitBreaker()
+        # hedge a second attempt after a fixed delay, or after the observed quantile latency
+        self.hedge_after = hedge_after
+        self.hedge_quantile = hedge_quantile
+        self.latency = LatencyWindow()
+        self._paused_until = 0.0
+        self.stats = {
+            "calls": 0, "attempts": 0, "retries": 0, "hedges": 0, "hedge_wins": 0,
+            "throttled_s": 0.0, "unavailable": 0,
+        }
+
+    # ---------- quota ----------
+    def charge(self, tokens: int):
+        """Debit tokens only known afterwards (completion tokens)."""
+        self.token_bucket.take(tokens)
+
+    def _reserve(self, cost: int, max_wait: float) -> float | None:
+        """Reserve one request + `cost` tokens; seconds to wait, or None if over max_wait."""
+        wait = max(
+            self.request_bucket.wait_time(1),
+            self.token_bucket.wait_time(cost),
+            self._paused_until - time.monotonic(),
+        )
+        if wait > max_wait:
+            return None
+        self.request_bucket.take(1)
+        self.token_bucket.take(cost)
+        return max(0.0, wait)
+
+    async def _acquire(self, cost: int):
+        wait = self._reserve(cost, self.max_queue_wait)
+        if wait is None:
+            raise LLMUnavailable("rate_limited")
+        if wait:
+            self.stats["throttled_s"] += wait
+            await asyncio.sleep(wait)
+
+    # ---------- hedging ----------
+    def hedge_delay(self) -> float | None:
+        if self.hedge_after > 0:
+            return self.hedge_after
+        if self.hedge_quantile > 0:
+            return self.latency.quantile(self.hedge_quantile)
+        return None
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]], cost: int, hedge: bool) -> T:
+        self.stats["attempts"] += 1
+        started = time.monotonic()
+        first = asyncio.ensure_future(fn())
+        delay = self.hedge_delay() if hedge else None
+        tasks = {first}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                # hedge only when healthy and within quota right now (never queue for it)
+                if not done and self.breaker.state == "closed" and self._reserve(cost, 0.0) is not None:
+                    self.stats["hedges"] += 1
+                    self.stats["attempts"] += 1
+                    tasks.add(asyncio.ensure_future(fn()))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.stats["hedge_wins"] += 1
+                        self.latency.add(time.monotonic() - started)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    # ---------- retry ----------
+    def _backoff(self, attempt: int, exc: BaseException) -> float | None:
+        """Delay before the next attempt, or None to give up."""
+        headers = exc.headers if isinstance(exc, aiohttp.ClientResponseError) else None
+        retry_after = retry_after_seconds(headers)
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                return None
+            # upstream asked everyone to hold off, not just this call
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            return retry_after + random.uniform(0, self.backoff_base)
+        # full jitter
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def call(self, fn: Callable[[], Awaitable[T]], cost: int = 0, hedge: bool = False) -> T:
+        self.stats["calls"] += 1
+        attempt = 0
+        try:
+            while True:
+                if not self.breaker.allow():
+                    raise LLMUnavailable("circuit_open")
+                await self._acquire(cost)
+                try:
+                    result = await self._attempt(fn, cost, hedge)
+                except Exception as exc:
+                    if not is_retryable(exc):
+                        # every attempt reports back, or a half-open breaker stays shut
+                        if isinstance(exc, aiohttp.ClientResponseError):
+                            self.breaker.record_success()
+                            raise LLMUnavailable(upstream_reason(exc)) from exc
+                        self.breaker.record_failure()
+                        raise
+                    self.breaker.record_failure()
+                    delay = self._backoff(attempt, exc)
+                    if delay is None or attempt >= self.max_retries:
+                        raise LLMUnavailable(upstream_reason(exc)) from exc
+                    attempt += 1
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(delay)
+                    continue
+                self.breaker.record_success()
+                return result
+        except LLMUnavailable:
+            self.stats["unavailable"] += 1
+            raise
+
+    def status(self) -> Dict:
+        return {
+            **self.stats,
+            "throttled_s": round(self.stats["throttled_s"], 3),
+            "breaker": {"state": self.breaker.state, "failures": self.breaker.failures, **self.breaker.stats},
+            "hedge_delay_s": self.hedge_delay(),
+        }
+
+
+def upstream_reason(exc: BaseException) -> str:
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return f"http_{exc.status}"
+    if isinstance(exc, asyncio.TimeoutError):
+        return "timeout"
+    return "connection"
@@ -1,10 +1,25 @@
-import os, re, unicodedata
-import pdfplumber
-from collections import defaultdict
+"""
+Handbook PDF -> cleaned text in the layout app.build_nested_dictionary reads.
+
+    python pdf_to_txt.py Motor_Insurance.pdf
+    python pdf_to_txt.py handbooks/ -o data/ --workers 8
 
-pdf_path = r"C:\\Users\\SABUJ KARMAKAR\\QA\\Motor_Insurance.pdf".strip()
-base, _ = os.path.splitext(pdf_path)
-txt_path = base + ".txt"
+Pages are extracted on a process pool (two columns per page), written to
+disk in page order as they complete, and PDFs whose content hash matches
+the last run are skipped (--force to redo).
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List
+
+import pdfplumber
 
 # ---------- TUNABLES ----------
 GUTTER_PX       = 10   # gap near the red divider
@@ -12,8 +27,15 @@ LINE_TOL        = 3    # line grouping tolerance (px)
 NOISE_THRESHOLD = 0.55 # min (letters+digits)/len(line) to keep a line
 MIN_LINE_LEN    = 4    # drop tiny lines unless meaningful
 CONFUSABLE_MAX  = 0.60 # if >60% of chars are confusables -> drop the line
+PAGES_PER_TASK  = 0    # pages per worker task; 0 = ~2 tasks per worker (each task re-opens the PDF)
+MIN_PAGES_PER_TASK = 8
 # ------------------------------
 
+# bump when cleaning/structuring changes, so unchanged PDFs are re-extracted once
+EXTRACTOR_VERSION = 2
+MANIFEST_NAME = ".pdf_manifest.json"
+PAGE_SEPARATOR = "-" * 60
+
 TRANSLATE_TABLE = str.maketrans({
     "“":"\"", "”":"\"", "‘":"'", "’":"'",
     "–":"-", "—":"-", "•":"*", "●":"*",
@@ -24,6 +46,9 @@ BOX_DRAWING_RX = re.compile(r"[┌┐└┘├┤┬┴┼─━│┃┆┇┊
 DIVIDER_RX     = re.compile(r"[|_¯=]+")
 MULTI_SPACE_RX = re.compile(r"[ \t]{2,}")
 WEIRD_RX       = re.compile(r"[^A-Za-z0-9\s\.,;:'\"()\[\]/&%@$#\+\-\?!]")
+REPEAT_PUNCT_RX = re.compile(r"([.\-_,;:'\"!?/()])\1{2,}")
+ACRONYM_RX     = re.compile(r"[A-Z]{2,}(?:\s+[A-Z]{2,})*")
+HYPHEN_WRAP_RX = re.compile(r"-\n(?=[a-z])")
 
 URL_EMAIL_RX   = re.compile(r"(www\.|https?://|@[A-Za-z0-9_.-]+|\.[A-Za-z]{2,})")
 
@@ -31,6 +56,13 @@ URL_EMAIL_RX   = re.compile(r"(www\.|https?://|@[A-Za-z0-9_.-]+|\.[A-Za-z]{2,})"
 CONFUSABLE_CHARS = set("lI1!|`'~^:;[]{}<>°º·•—–-_=+\\")
 VOWELS_RX = re.compile(r"[AEIOUaeiou]")
 
+# Q/Ans markers as they appear across insurers' handbooks -> "Q." / "Ans."
+QUESTION_RX = re.compile(r"^(?:Q(?:ues(?:tion)?)?\s*\d*\s*[.:)\-]|Q\d+\b)\s*", re.IGNORECASE)
+ANSWER_RX   = re.compile(r"^Ans(?:wer)?\s*[.:)\-]\s*", re.IGNORECASE)
+# "3. Frequently asked questions 5" inside a contents block (page number at the end)
+TOC_ENTRY_RX = re.compile(r"^\d+\.\s+.*\D\s+\d{1,3}$")
+
+
 def normalize_text(s: str) -> str:
     if not s:
         return ""
@@ -38,7 +70,7 @@ def normalize_text(s: str) -> str:
     s = BOX_DRAWING_RX.sub(" ", s)
     s = DIVIDER_RX.sub(" ", s)
     s = WEIRD_RX.sub(" ", s)
-    s = re.sub(r"([.\-_,;:'\"!?/()])\1{2,}", r"\1\1", s)
+    s = REPEAT_PUNCT_RX.sub(r"\1\1", s)
     s = MULTI_SPACE_RX.sub(" ", s)
     return s.strip()
 
@@ -53,7 +85,7 @@ def confusable_ratio(s: str) -> float:
 
 def looks_acronym(line: str) -> bool:
     # keep legit acronyms like "IRDA", "RTO", etc.
-    return bool(re.fullmatch(r"[A-Z]{2,}(?:\s+[A-Z]{2,})*", line))
+    return bool(ACRONYM_RX.fullmatch(line))
 
 def is_meaningful(line: str) -> bool:
     if not line:
@@ -96,7 +128,7 @@ def words_to_text(words, line_tol=LINE_TOL):
             lines.append(cln)
 
     text = "\n".join(lines)
-    text = re.sub(r"-\n(?=[a-z])", "", text)  # join hyphenated words
+    text = HYPHEN_WRAP_RX.sub("", text)  # join hyphenated words
     return text
 
 def extract_half(page, bbox):
@@ -104,29 +136,178 @@ def extract_half(page, bbox):
     words = half.extract_words(x_tolerance=1, y_tolerance=1, keep_blank_chars=False, use_text_flow=False)
     return words_to_text(words)
 
-all_pages_text = []
+def extract_page(page) -> str:
+    W, H = page.width, page.height
+    mid = W / 2
+    left_bbox  = (0, 0, max(0, mid - GUTTER_PX), H)
+    right_bbox = (min(W, mid + GUTTER_PX), 0, W, H)
 
-try:
+    left_text  = extract_half(page, left_bbox)
+    right_text = extract_half(page, right_bbox)
+    return "\n\n".join([t for t in (left_text, right_text) if t.strip()])
+
+
+# ======================================================
+# PARALLEL EXTRACTION
+# ======================================================
+def extract_pages(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Worker task: cleaned text of pages [start, stop)."""
+    with pdfplumber.open(pdf_path) as pdf:
+        texts = []
+        for page in pdf.pages[start:stop]:
+            texts.append(extract_page(page))
+            page.flush_cache()
+        return texts
+
+def iter_page_texts(pdf_path: Path, pool: Executor, workers: int,
+                    pages_per_task: int = PAGES_PER_TASK) -> Iterator[str]:
+    """Page texts in page order, while later pages are still being extracted."""
     with pdfplumber.open(pdf_path) as pdf:
-        for i, page in enumerate(pdf.pages, start=1):
-            W, H = page.width, page.height
-            mid = W / 2
-            left_bbox  = (0, 0, max(0, mid - GUTTER_PX), H)
-            right_bbox = (min(W, mid + GUTTER_PX), 0, W, H)
+        n_pages = len(pdf.pages)
+    if pages_per_task <= 0:
+        pages_per_task = max(MIN_PAGES_PER_TASK, -(-n_pages // (workers * 2)))
+    max_inflight = workers * 4
+
+    ranges = iter(range(0, n_pages, pages_per_task))
+    inflight: Deque = deque()
+    for start in ranges:
+        inflight.append(pool.submit(extract_pages, str(pdf_path), start, min(start + pages_per_task, n_pages)))
+        if len(inflight) >= max_inflight:
+            yield from inflight.popleft().result()
+    while inflight:
+        yield from inflight.popleft().result()
+
+
+# ======================================================
+# Q/Ans STRUCTURE (what build_nested_dictionary expects)
+# ======================================================
+def structure_lines(lines: Iterable[str]) -> Iterator[str]:
+    """
+    - question/answer markers ("Q1:", "Question.", "Answer:" ...) -> "Q." / "Ans."
+    - contents entries ("2. Motor Insurance 2") dropped, so they are not
+      taken for section headers
+    """
+    in_contents = False
+    for line in lines:
+        if line.lower().startswith(("contents", "table of contents")):
+            in_contents = True
+            yield line
+            continue
+        if in_contents:
+            if TOC_ENTRY_RX.match(line):
+                continue
+            in_contents = False
+
+        if ANSWER_RX.match(line):
+            line = ANSWER_RX.sub("Ans. ", line, count=1).rstrip()
+        elif QUESTION_RX.match(line):
+            line = QUESTION_RX.sub("Q. ", line, count=1).rstrip()
+        yield line
+
+def iter_output_lines(page_texts: Iterable[str]) -> Iterator[str]:
+    first = True
+    for text in page_texts:
+        if not text:
+            continue
+        if not first:
+            yield from ("", PAGE_SEPARATOR, "")
+        first = False
+        yield from text.splitlines()
+
+
+# ======================================================
+# CONVERSION
+# ======================================================
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def load_manifest(out_dir: Path) -> Dict[str, Dict]:
+    path = out_dir / MANIFEST_NAME
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+def save_manifest(out_dir: Path, manifest: Dict[str, Dict]):
+    tmp = out_dir / (MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, out_dir / MANIFEST_NAME)
+
+def convert_pdf(pdf_path: Path, txt_path: Path, pool: Executor, workers: int,
+                structure: bool = True, pages_per_task: int = PAGES_PER_TASK) -> int:
+    """Stream one PDF into txt_path (atomically replaced). Returns lines written."""
+    lines = iter_output_lines(iter_page_texts(pdf_path, pool, workers, pages_per_task))
+    if structure:
+        lines = structure_lines(lines)
+
+    tmp = txt_path.with_name(txt_path.name + ".tmp")
+    written = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(line + "\n")
+            written += 1
+    os.replace(tmp, txt_path)
+    return written
+
+def iter_pdfs(paths: Iterable[Path]) -> Iterator[Path]:
+    for path in paths:
+        if path.is_dir():
+            yield from sorted(p for p in path.rglob("*") if p.suffix.lower() == ".pdf")
+        elif path.exists():
+            yield path
+        else:
+            print(f"❌ Not found: {path}")
+
+def convert_paths(paths: Iterable[Path], out_dir: Path | None = None, workers: int | None = None,
+                  structure: bool = True, force: bool = False,
+                  pages_per_task: int = PAGES_PER_TASK) -> List[Path]:
+    """
+    Convert every PDF in `paths` (files or directories) to .txt next to it,
+    or into `out_dir`. Returns the text files (re)written.
+    """
+    workers = workers or os.cpu_count() or 1
+    written = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for pdf_path in iter_pdfs(paths):
+            target_dir = out_dir or pdf_path.parent
+            target_dir.mkdir(parents=True, exist_ok=True)
+            txt_path = target_dir / (pdf_path.stem + ".txt")
+
+            manifest = load_manifest(target_dir)
+            digest = file_sha256(pdf_path)
+            entry = {"pdf": str(pdf_path), "sha256": digest, "version": EXTRACTOR_VERSION,
+                     "structure": structure}
+            if not force and txt_path.exists() and manifest.get(txt_path.name) == entry:
+                print(f"✅ {pdf_path} unchanged — skipped")
+                continue
+
+            try:
+                n = convert_pdf(pdf_path, txt_path, pool, workers, structure, pages_per_task)
+            except Exception as e:
+                print(f"❌ {pdf_path}: {e}")
+                continue
+
+            manifest[txt_path.name] = entry
+            save_manifest(target_dir, manifest)
+            written.append(txt_path)
+            print(f"✅ {pdf_path} -> {txt_path} ({n} lines)")
+    return written
 
-            left_text  = extract_half(page, left_bbox)
-            right_text = extract_half(page, right_bbox)
 
-            combined = "\n\n".join([t for t in (left_text, right_text) if t.strip()])
-            if combined:
-                all_pages_text.append(combined)
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", type=Path, help="PDF files and/or directories")
+    parser.add_argument("-o", "--out-dir", type=Path, help="write .txt files here (default: next to each PDF)")
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: CPU count)")
+    parser.add_argument("--pages-per-task", type=int, default=PAGES_PER_TASK, help="0 = auto")
+    parser.add_argument("--raw", action="store_true", help="skip the Q./Ans. structuring pass")
+    parser.add_argument("--force", action="store_true", help="re-extract even if the PDF is unchanged")
+    args = parser.parse_args()
 
-    final_text = ("\n\n" + ("-" * 60) + "\n\n").join(all_pages_text)
-    with open(txt_path, "w", encoding="utf-8") as f:
-        f.write(final_text)
+    convert_paths(args.paths, args.out_dir, args.workers, structure=not args.raw,
+                  force=args.force, pages_per_task=args.pages_per_task)
 
-    print("✅ Clean, ordered text saved.")
-    print(f"📁 {txt_path}")
 
-except Exception as e:
-    print("❌ Error:", e)
+if __name__ == "__main__":
+    main()
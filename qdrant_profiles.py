@@ -0,0 +1,102 @@
+import os
+from typing import Dict
+
+from qdrant_client import models
+
+from retrievers import TENANT_FIELD
+
+# =========================
+# COLLECTION PROFILES (QDRANT_PROFILE)
+# =========================
+# float:  float32 vectors and payload in RAM (the original layout)
+# scalar: int8 scalar-quantized copy in RAM, float32 originals on disk, rescored
+# binary: 1-bit quantized copy in RAM, float32 originals on disk, rescored
+#         with heavier oversampling (best for larger models; check recall first)
+PROFILES: Dict[str, Dict] = {
+    "float": {"quantization": None, "on_disk": False, "on_disk_payload": False, "oversampling": 1.0},
+    "scalar": {"quantization": "scalar", "on_disk": True, "on_disk_payload": True, "oversampling": 2.0},
+    "binary": {"quantization": "binary", "on_disk": True, "on_disk_payload": True, "oversampling": 3.0},
+}
+
+# keyword indexes, so filtering/reconciling by section, source or corpus does not scan payloads
+PAYLOAD_INDEXES = ("section", "source", TENANT_FIELD)
+# the only payload field retrieval reads (context text; ids come with the point)
+SEARCH_PAYLOAD_FIELDS = ["text"]
+# stored in the chunk but derivable from "text" (its "Q. ..." first line)
+DROPPED_PAYLOAD_FIELDS = ("question",)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return default if value is None else value.lower() in ("1", "true", "yes")
+
+
+def resolve_profile(name: str | None = None) -> Dict:
+    """Profile defaults with QDRANT_* env overrides."""
+    name = (name or os.getenv("QDRANT_PROFILE", "float")).lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown QDRANT_PROFILE: {name!r}")
+
+    profile = {"name": name, **PROFILES[name]}
+    profile["on_disk"] = _env_bool("QDRANT_ON_DISK", profile["on_disk"])
+    profile["on_disk_payload"] = _env_bool("QDRANT_ON_DISK_PAYLOAD", profile["on_disk_payload"])
+    profile["rescore"] = _env_bool("QDRANT_RESCORE", profile["quantization"] is not None)
+    profile["oversampling"] = float(os.getenv("QDRANT_OVERSAMPLING", profile["oversampling"]))
+    profile["hnsw_m"] = int(os.getenv("QDRANT_HNSW_M", 16))
+    profile["hnsw_ef_construct"] = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", 100))
+    # 0 = Qdrant's default search ef
+    profile["hnsw_ef"] = int(os.getenv("QDRANT_HNSW_EF", 0))
+    return profile
+
+
+def quantization_config(profile: Dict):
+    if profile["quantization"] == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+            )
+        )
+    if profile["quantization"] == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def collection_params(profile: Dict, dim: int) -> Dict:
+    """Keyword arguments for QdrantClient.create_collection."""
+    return {
+        "vectors_config": models.VectorParams(
+            size=dim, distance=models.Distance.COSINE, on_disk=profile["on_disk"]
+        ),
+        "hnsw_config": models.HnswConfigDiff(
+            m=profile["hnsw_m"], ef_construct=profile["hnsw_ef_construct"]
+        ),
+        "quantization_config": quantization_config(profile),
+        "on_disk_payload": profile["on_disk_payload"],
+    }
+
+
+def search_params(profile: Dict) -> models.SearchParams | None:
+    """Per-query params: HNSW ef and quantized search with float32 rescoring."""
+    quantization = None
+    if profile["quantization"]:
+        quantization = models.QuantizationSearchParams(
+            rescore=profile["rescore"], oversampling=profile["oversampling"]
+        )
+    if quantization is None and not profile["hnsw_ef"]:
+        return None
+    return models.SearchParams(hnsw_ef=profile["hnsw_ef"] or None, quantization=quantization)
+
+
+def payload_index_schema(field: str):
+    """Keyword index; the tenant field is marked so Qdrant co-locates each tenant's points."""
+    if field == TENANT_FIELD:
+        return models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD, is_tenant=True)
+    return models.PayloadSchemaType.KEYWORD
+
+
+def tenant_filter(corpus: str) -> models.Filter:
+    return models.Filter(must=[models.FieldCondition(key=TENANT_FIELD, match=models.MatchValue(value=corpus))])
+
+
+def lean_payload(chunk: Dict) -> Dict:
+    return {k: v for k, v in chunk.items() if k not in DROPPED_PAYLOAD_FIELDS}
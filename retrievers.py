@@ -0,0 +1,295 @@
+import asyncio
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+
+from faq_index import top_k_similar, top_k_similar_batch
+
+# =========================
+# LOCAL INDEX LAYOUT (written by ingest.py, INGEST_BACKEND=local)
+# =========================
+# <dir>/vectors.npy     float32 (N, dim), L2-normalized, memory-mapped at load
+# <dir>/payloads.jsonl  one payload per row (same order), with "id" and its corpus (TENANT_FIELD)
+# <dir>/meta.json       {"model", "dim", "count", "digest"}
+VECTORS_FILE = "vectors.npy"
+PAYLOADS_FILE = "payloads.jsonl"
+META_FILE = "meta.json"
+# payload field holding a chunk's corpus (set by ingest, named as app.iter_handbook_files names it)
+TENANT_FIELD = "corpus"
+
+
+class Hit(NamedTuple):
+    id: str
+    score: float
+    payload: Dict
+
+    @property
+    def text(self) -> str:
+        return self.payload.get("text", "")
+
+
+# =========================
+# QDRANT
+# =========================
+class QdrantRetriever:
+    name = "qdrant"
+
+    def __init__(self, host: str, port: int, collection: str, profile: Dict | None = None,
+                 path: str | None = None, routing: str = "filter", collection_template: str = "{corpus}"):
+        from qdrant_client import AsyncQdrantClient
+
+        from qdrant_profiles import SEARCH_PAYLOAD_FIELDS, resolve_profile, search_params
+
+        self.collection = collection
+        # path: Qdrant local mode (embedded, one process; benchmarks and tests without a server)
+        self.client = AsyncQdrantClient(path=path) if path else AsyncQdrantClient(host=host, port=port)
+        self.profile = profile or resolve_profile()
+        self.search_params = search_params(self.profile)
+        self.payload_fields = SEARCH_PAYLOAD_FIELDS
+        if routing not in ("filter", "collection"):
+            raise ValueError(f"Unknown TENANT_ROUTING: {routing!r}")
+        self.routing = routing
+        self.collection_template = collection_template
+
+    def route(self, corpus: str | None) -> Tuple[str, str | None]:
+        """
+        (collection, corpus filter) for a request: "filter" routing searches the
+        shared collection for points tagged with the corpus, "collection" routing
+        searches the corpus's own collection ("/" in the corpus becomes "_").
+        """
+        if corpus is None:
+            return self.collection, None
+        if self.routing == "collection":
+            return self.collection_template.format(corpus=corpus.replace("/", "_")), None
+        return self.collection, corpus
+
+    def _target(self, corpus: str | None):
+        from qdrant_profiles import tenant_filter
+
+        collection, corpus_filter = self.route(corpus)
+        return collection, tenant_filter(corpus_filter) if corpus_filter else None
+
+    async def search(self, vector: np.ndarray, k: int, corpus: str | None = None) -> List[Hit]:
+        collection, query_filter = self._target(corpus)
+        result = await self.client.query_points(
+            collection_name=collection,
+            query=vector.tolist(),
+            query_filter=query_filter,
+            limit=k,
+            search_params=self.search_params,
+            with_payload=self.payload_fields,
+        )
+        return [
+            Hit(str(point.id), float(point.score), point.payload)
+            for point in result.points
+            if point.payload and "text" in point.payload
+        ]
+
+    async def search_batch(self, vectors: np.ndarray, k: int, corpus: str | None = None) -> List[List[Hit]]:
+        """One round trip for many query vectors (Query API batch)."""
+        from qdrant_client import models
+
+        collection, query_filter = self._target(corpus)
+        responses = await self.client.query_batch_points(
+            collection_name=collection,
+            requests=[
+                models.QueryRequest(
+                    query=v.tolist(), filter=query_filter, limit=k, params=self.search_params,
+                    with_payload=self.payload_fields,
+                )
+                for v in vectors
+            ],
+        )
+        return [
+            [
+                Hit(str(point.id), float(point.score), point.payload)
+                for point in response.points
+                if point.payload and "text" in point.payload
+            ]
+            for response in responses
+        ]
+
+    async def counts(self, corpora: Iterable[str] = ()) -> Dict[str, int]:
+        """
+        Points per collection: the shared one, plus (routing "collection") the
+        collection of each of `corpora` that has been ingested.
+        """
+        counts = {self.collection: (await self.client.count(collection_name=self.collection, exact=True)).count}
+        for corpus in corpora:
+            collection, _ = self.route(corpus)
+            if collection not in counts and await self.client.collection_exists(collection):
+                counts[collection] = (await self.client.count(collection_name=collection, exact=True)).count
+        return counts
+
+    async def count(self, corpora: Iterable[str] = ()) -> int:
+        return sum((await self.counts(corpora)).values())
+
+    async def all_payloads(self, corpus: str | None = None) -> List[Dict]:
+        """
+        Every chunk's search fields and corpus (with its point id) in the
+        collection `corpus` routes to, e.g. to build the BM25 index.
+        """
+        collection, _ = self.route(corpus)
+        payloads, offset = [], None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=collection,
+                limit=1000,
+                offset=offset,
+                with_payload=self.payload_fields + [TENANT_FIELD],
+                with_vectors=False,
+            )
+            payloads.extend({"id": str(p.id), **(p.payload or {})} for p in points)
+            if offset is None:
+                return payloads
+
+    async def close(self):
+        await self.client.close()
+
+
+# =========================
+# IN-PROCESS (NumPy exact search, optional FAISS)
+# =========================
+class LocalIndex(NamedTuple):
+    """One loaded index; swapped whole on reload, so a search never mixes two."""
+    meta: Dict
+    vectors: np.ndarray
+    payloads: List[Dict]
+    # corpus -> (its rows in `vectors`, those rows as one contiguous matrix)
+    corpora: Dict[str, Tuple[np.ndarray, np.ndarray]]
+    faiss: object | None
+
+
+class LocalRetriever:
+    """
+    Exact cosine search over a memory-mapped matrix built by ingest.py.
+    Re-opens the index when ingest.py replaces it (meta.json mtime).
+    A corpus restricts the search to the rows tagged with it (exact NumPy
+    search over its own sub-matrix, also when FAISS serves the untagged queries).
+    Searches and reloads run in a worker thread, off the event loop.
+    """
+
+    def __init__(self, index_dir: Path, use_faiss: bool = False):
+        self.index_dir = Path(index_dir)
+        self.use_faiss = use_faiss
+        self.name = "faiss" if use_faiss else "numpy"
+        self._mtime = None
+        self._reload_lock = threading.Lock()
+        self.index = self._load()
+
+    def _load(self) -> LocalIndex:
+        meta_path = self.index_dir / META_FILE
+        if not meta_path.exists():
+            raise FileNotFoundError(
+                f"Local index not found in {self.index_dir}; run ingest.py with INGEST_BACKEND=local"
+            )
+        self._mtime = meta_path.stat().st_mtime_ns
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        vectors = np.load(self.index_dir / VECTORS_FILE, mmap_mode="r")
+        with open(self.index_dir / PAYLOADS_FILE, encoding="utf-8") as f:
+            payloads = [json.loads(line) for line in f]
+
+        rows: Dict[str, List[int]] = {}
+        for i, payload in enumerate(payloads):
+            if payload.get(TENANT_FIELD):
+                rows.setdefault(payload[TENANT_FIELD], []).append(i)
+        corpora = {}
+        for corpus, r in rows.items():
+            r = np.asarray(r, dtype=np.int64)
+            corpora[corpus] = (r, np.ascontiguousarray(vectors[r], dtype=np.float32))
+
+        faiss_index = None
+        if self.use_faiss:
+            import faiss
+
+            faiss_index = faiss.IndexFlatIP(vectors.shape[1])
+            faiss_index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+        return LocalIndex(meta, vectors, payloads, corpora, faiss_index)
+
+    def _current(self) -> LocalIndex:
+        """The loaded index, re-opened first if ingest.py replaced it."""
+        try:
+            mtime = (self.index_dir / META_FILE).stat().st_mtime_ns
+        except FileNotFoundError:
+            return self.index
+        if mtime != self._mtime:
+            with self._reload_lock:
+                if mtime != self._mtime:
+                    self.index = self._load()
+        return self.index
+
+    def route(self, corpus: str | None) -> Tuple[str, str | None]:
+        """(index, corpus filter): one index, rows filtered by corpus."""
+        return str(self.index_dir), corpus
+
+    @staticmethod
+    def _hit(index: LocalIndex, i: int, score: float) -> Hit:
+        return Hit(index.payloads[i].get("id", str(i)), score, index.payloads[i])
+
+    def search_sync(self, vector: np.ndarray, k: int, corpus: str | None = None) -> List[Hit]:
+        if corpus is not None:
+            return self.search_batch_sync(np.asarray(vector).reshape(1, -1), k, corpus)[0]
+        index = self._current()
+        if index.faiss is not None:
+            scores, rows = index.faiss.search(vector.reshape(1, -1).astype(np.float32), k)
+            matches = [(int(r), float(s)) for r, s in zip(rows[0], scores[0]) if r >= 0]
+        else:
+            matches = top_k_similar(index.vectors, vector, k)
+        return [self._hit(index, i, score) for i, score in matches]
+
+    async def search(self, vector: np.ndarray, k: int, corpus: str | None = None) -> List[Hit]:
+        return await asyncio.to_thread(self.search_sync, vector, k, corpus)
+
+    def search_batch_sync(self, vectors: np.ndarray, k: int, corpus: str | None = None) -> List[List[Hit]]:
+        index = self._current()
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if corpus is not None:
+            if corpus not in index.corpora:
+                return [[] for _ in vectors]
+            rows, matrix = index.corpora[corpus]
+            batches = [
+                [(int(rows[r]), score) for r, score in matches]
+                for matches in top_k_similar_batch(matrix, vectors, k)
+            ]
+        elif index.faiss is not None:
+            scores, rows = index.faiss.search(vectors, k)
+            batches = [
+                [(int(r), float(s)) for r, s in zip(row_ids, row_scores) if r >= 0]
+                for row_ids, row_scores in zip(rows, scores)
+            ]
+        else:
+            batches = top_k_similar_batch(index.vectors, vectors, k)
+        return [[self._hit(index, i, score) for i, score in matches] for matches in batches]
+
+    async def search_batch(self, vectors: np.ndarray, k: int, corpus: str | None = None) -> List[List[Hit]]:
+        return await asyncio.to_thread(self.search_batch_sync, vectors, k, corpus)
+
+    async def counts(self, corpora: Iterable[str] = ()) -> Dict[str, int]:
+        """One index for every corpus."""
+        index = await asyncio.to_thread(self._current)
+        return {str(self.index_dir): int(index.vectors.shape[0])}
+
+    async def count(self, corpora: Iterable[str] = ()) -> int:
+        return sum((await self.counts(corpora)).values())
+
+    async def all_payloads(self, corpus: str | None = None) -> List[Dict]:
+        return (await asyncio.to_thread(self._current)).payloads
+
+    async def close(self):
+        pass
+
+
+def create_retriever(backend: str, **config):
+    """RETRIEVER_BACKEND: qdrant (default) | numpy | faiss"""
+    backend = (backend or "qdrant").lower()
+    if backend == "qdrant":
+        return QdrantRetriever(
+            config["host"], config["port"], config["collection"], path=config.get("path"),
+            routing=config.get("routing", "filter"), collection_template=config.get("collection_template", "{corpus}"),
+        )
+    if backend in ("numpy", "faiss"):
+        return LocalRetriever(config["index_dir"], use_faiss=backend == "faiss")
+    raise ValueError(f"Unknown RETRIEVER_BACKEND: {backend!r}")
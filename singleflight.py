@@ -0,0 +1,56 @@
+import asyncio
+from typing import Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is in flight await the same result (or exception).
+    A caller that disconnects does not cancel the shared work.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def __len__(self):
+        return len(self._inflight)
+
+    def join(self, key: str) -> asyncio.Future | None:
+        """The in-flight result for `key`, if any (counted as coalesced)."""
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.stats["calls"] += 1
+            self.stats["coalesced"] += 1
+        return fut
+
+    def lead(self, key: str) -> asyncio.Future:
+        """
+        Register the caller as the producer for `key`; it must resolve the
+        returned future (set_result / set_exception) when done.
+        """
+        fut = asyncio.get_running_loop().create_future()
+        self._track(key, fut)
+        return fut
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        fut = self.join(key)
+        if fut is None:
+            fut = asyncio.ensure_future(fn())
+            self._track(key, fut)
+        return await asyncio.shield(fut)
+
+    def _track(self, key: str, fut: asyncio.Future):
+        self.stats["calls"] += 1
+        self.stats["executions"] += 1
+        self._inflight[key] = fut
+        fut.add_done_callback(lambda f: self._done(key, f))
+
+    def _done(self, key: str, fut: asyncio.Future):
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+        # mark the exception retrieved even if every waiter went away
+        if not fut.cancelled():
+            fut.exception()
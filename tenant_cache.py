@@ -0,0 +1,110 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+
+import numpy as np
+
+from app import Handbook
+from faq_index import build_exact_index, normalize, top_k_similar
+
+
+class CorpusFaq:
+    """FAQ tiers of one tenant/product corpus: its handbook, exact index, question matrix."""
+
+    __slots__ = ("corpus", "handbook", "index", "matrix", "source")
+
+    def __init__(self, corpus: str, hb: Handbook, matrix: np.ndarray, source: str):
+        self.corpus = corpus
+        self.handbook = hb
+        self.index = build_exact_index(hb.to_nested())
+        self.matrix = matrix
+        self.source = source
+
+    def __len__(self):
+        return len(self.handbook)
+
+    @property
+    def answers(self) -> Tuple[str, ...]:
+        return self.handbook.answers
+
+    def exact(self, question: str) -> str | None:
+        hit = self.index.get(normalize(question))
+        return hit["answer"] if hit else None
+
+    def semantic(self, vector: np.ndarray, k: int, threshold: float) -> Tuple[str, float] | None:
+        matches = top_k_similar(self.matrix, vector, k)
+        if not matches or matches[0][1] < threshold:
+            return None
+        best_idx, best_score = matches[0]
+        return self.answers[best_idx], best_score
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate resident size (a memory-mapped matrix counts in full)."""
+        text = sum(len(a) for a in self.answers) + sum(2 * len(q) + 64 for q in self.index)
+        return int(self.matrix.nbytes) + 2 * text
+
+
+class TenantCache:
+    """
+    LRU of per-corpus data, bounded by entry count and by total `sizeof`
+    bytes (0 = no byte limit). The most recent entry is always kept, even
+    when it alone is over the budget.
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 0,
+                 sizeof: Callable[[object], int] = lambda value: 0):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, Tuple[object, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats_counts = {"hits": 0, "misses": 0, "loads": 0, "evictions": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats_counts["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats_counts["hits"] += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value):
+        size = self.sizeof(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            self.stats_counts["loads"] += 1
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.stats_counts["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def values(self):
+        with self._lock:
+            return [value for value, _ in self._entries.values()]
+
+    def stats(self) -> Dict:
+        return {
+            **self.stats_counts,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from app import parse_handbook
+from chunking import iter_section_prose
+
+HANDBOOK = Path(__file__).resolve().parent.parent / "motor_insurance.txt"
+
+CLAIM_DOCUMENTS_ANSWER = (
+    "Generally, the following documents are required to be submitted. However, read through your "
+    "policy to see the complete list-duly filled in claim form, RC copy of the vehicle, Original "
+    "estimate of loss, Original repair invoice and payment receipt. In case cashless facility is "
+    "availed, only repair invoice would need to be submitted and FIR, if required. For theft claims, "
+    "the keys are to be submitted. Theft claims would also require non-traceable certificate to be "
+    "submitted."
+)
+
+
+def test_last_faq_answer_stops_at_the_page_break():
+    hb = parse_handbook(HANDBOOK)
+    answers = {question: answer for _, question, answer in hb.items()}
+    question = "What are the documents that are required to be submitted for a Motor Insurance claim?"
+    assert answers[question] == CLAIM_DOCUMENTS_ANSWER
+
+
+def test_tat_table_is_section_prose():
+    prose = {section: lines for section, lines in iter_section_prose(HANDBOOK)}
+    assert prose["FAQs on Motor Insurance"][0] == "Policyholder Servicing Turnaround Times"